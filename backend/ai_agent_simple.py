@@ -157,13 +157,13 @@ Always be helpful, thorough, and complete the requested tasks efficiently."""
                         # Execute tool
                         tool_result = None
                         if tool_call['name'] == 'read_file_content':
-                            tool_result = read_file_content.invoke(tool_call['args'])
+                            tool_result = await read_file_content.ainvoke(tool_call['args'])
                         elif tool_call['name'] == 'write_file_content':
-                            tool_result = write_file_content.invoke(tool_call['args'])
+                            tool_result = await write_file_content.ainvoke(tool_call['args'])
                         elif tool_call['name'] == 'list_files_in_directory':
-                            tool_result = list_files_in_directory.invoke(tool_call['args'])
+                            tool_result = await list_files_in_directory.ainvoke(tool_call['args'])
                         elif tool_call['name'] == 'get_file_info':
-                            tool_result = get_file_info.invoke(tool_call['args'])
+                            tool_result = await get_file_info.ainvoke(tool_call['args'])
                         
                         if tool_result:
                             # Yield tool result
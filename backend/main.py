@@ -4,10 +4,14 @@ Provides file system operations, WebSocket support, and AI analysis capabilities
 """
 import os
 import json
+import logging
 import asyncio
+import concurrent.futures
 import time
+import mimetypes
+import uuid
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi import UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,8 +19,10 @@ from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from pydantic import BaseModel, Field, ConfigDict
 import aiofiles
 import shutil
+import stat
 import pandas as pd
 import openpyxl
+from functools import lru_cache, partial
 
 # AI Agent import - using manager for version switching
 # Support both "python -m uvicorn backend.main:app" (package) and "python backend/main.py" (script)
@@ -34,6 +40,22 @@ from watchdog.events import FileSystemEventHandler
 import subprocess
 import platform
 
+# Constant for the process lifetime; avoids a uname() per request
+_SYSTEM = platform.system()
+# Command that opens a file with the default application (None on Windows: os.startfile)
+if _SYSTEM == "Darwin":
+    _OPEN_CMD = ["open"]
+elif _SYSTEM == "Windows":
+    _OPEN_CMD = None
+else:  # Linux and other Unix-like systems
+    _OPEN_CMD = ["xdg-open"]
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 try:
     import tkinter as tk
     from tkinter import filedialog
@@ -41,18 +63,47 @@ try:
 except ImportError:
     HAS_TKINTER = False
 
+# Module logger; LOG_LEVEL=DEBUG enables the verbose broadcast/watcher/save diagnostics
+logger = logging.getLogger("ide")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(levelname)s:     %(message)s"))
+    logger.addHandler(_log_handler)
+    logger.propagate = False
+
+if HAS_ORJSON:
+    # AI thoughts may carry numpy scalars and non-string keys from data analysis tools
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes"""
+        return orjson.dumps(obj, option=ORJSON_OPTIONS)
+
+    _loads = orjson.loads
+else:
+    # Compact separators, and no \uXXXX escaping of Cyrillic/emoji content
+    _json_dumps = partial(json.dumps, separators=(",", ":"), ensure_ascii=False)
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes"""
+        return _json_dumps(obj).encode()
+
+    _loads = json.loads
+
 app = FastAPI(title="Text IDE Backend", version="1.0.0")
 
+
 @app.on_event("startup")
 async def startup_event():
     """Set up event loop for FileWatcher and start watching"""
     global global_event_loop
     global_event_loop = asyncio.get_running_loop()
     file_watcher.loop = global_event_loop
-    print(f"Global event loop set for FileWatcher: {global_event_loop}")
+    logger.info("Global event loop set for FileWatcher: %s", global_event_loop)
     
     # Start file watcher after event loop is set
-    print("Starting file watcher...")
+    logger.info("Starting file watcher...")
     current_dir = os.path.dirname(os.path.abspath(__file__))
     parent_dir = os.path.dirname(current_dir)
     project_root = os.path.dirname(current_dir)  # repo root
@@ -84,22 +135,22 @@ async def startup_event():
                         "Along came a blackbird and pecked off her nose.\n"
                     )
     except Exception as e:
-        print(f"Failed to initialize sample directory: {e}")
+        logger.warning("Failed to initialize sample directory: %s", e)
     # Watch project root by default in hosted environments
     path_to_watch = os.getenv("WATCH_PATH", os.path.join(parent_dir, "test-directory"))
     if not os.path.isabs(path_to_watch):
         path_to_watch = os.path.join(parent_dir, path_to_watch)
     if os.path.exists(path_to_watch):
-        print(f"Adding {path_to_watch} to file watcher")
+        logger.info("Adding %s to file watcher", path_to_watch)
         try:
             observer.schedule(file_watcher, path_to_watch, recursive=True)
             file_watcher.watched_paths.add(path_to_watch)
             observer.start()
-            print("File watcher started!")
+            logger.info("File watcher started!")
         except Exception as e:
-            print(f"Watcher error: {e}")
+            logger.error("Watcher error: %s", e)
     else:
-        print(f"Watch path not found: {path_to_watch}")
+        logger.warning("Watch path not found: %s", path_to_watch)
 
 # CORS middleware for frontend communication
 # In production, set FRONTEND_ORIGINS as comma-separated list, e.g. "https://your-frontend.onrender.com"
@@ -140,7 +191,7 @@ MAX_WEBSOCKET_CONNECTIONS = 10  # Increased for multiple tabs
 async def broadcast_to_websockets(message: dict, exclude_client: str = None):
     """Broadcast message to all connected WebSocket clients"""
     if not websocket_connections:
-        print("No WebSocket connections to broadcast to")
+        logger.debug("No WebSocket connections to broadcast to")
         return
         
     # Don't send file content in broadcast (too much data)
@@ -155,38 +206,37 @@ async def broadcast_to_websockets(message: dict, exclude_client: str = None):
     target_clients = {cid: conn for cid, conn in websocket_connections.items() if cid != exclude_client}
     
     if not target_clients:
-        print("No other clients to broadcast to (excluding sender)")
+        logger.debug("No other clients to broadcast to (excluding sender)")
         return
         
-    print(f"Broadcasting to {len(target_clients)} clients (excluding {exclude_client}): {broadcast_message}")
+    logger.debug("Broadcasting to %d clients (excluding %s): %s", len(target_clients), exclude_client, broadcast_message)
+    
+    # Serialize once and send the same frame to every recipient
+    payload = _dumps(broadcast_message).decode()
     
     # Send to all connections except excluded
     dead_connections = []
-    print(f"Iterating over {len(target_clients)} target connections")
     
     # Create a copy to avoid modification during iteration
     connections_copy = list(target_clients.items())
     
     for client_id, conn in connections_copy:
         try:
-            print(f"Processing connection {client_id}, type: {type(conn)}")
             if not hasattr(conn, 'websocket'):
-                print(f"Connection {client_id} has no websocket attribute")
+                logger.warning("Connection %s has no websocket attribute", client_id)
                 dead_connections.append(client_id)
                 continue
                 
-            await conn.websocket.send_text(json.dumps(broadcast_message))
-            print(f"Sent to {client_id}")
+            await conn.websocket.send_text(payload)
+            logger.debug("Sent to %s", client_id)
         except Exception as e:
-            print(f"Failed to send to {client_id}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Failed to send to %s: %s", client_id, e)
             dead_connections.append(client_id)
     
     # Clean up dead connections
     for client_id in dead_connections:
         websocket_connections.pop(client_id, None)
-        print(f"Removed dead connection: {client_id}")
+        logger.info("Removed dead connection: %s", client_id)
 
 async def cleanup_old_connections():
     """Remove disconnected connections"""
@@ -201,27 +251,27 @@ async def cleanup_old_connections():
         try:
             # Check if connection still exists and is valid
             if not hasattr(conn, 'websocket') or not hasattr(conn, 'last_ping'):
-                print(f"Invalid connection object for {client_id}")
+                logger.warning("Invalid connection object for %s", client_id)
                 to_remove.append(client_id)
                 continue
                 
             # Remove connections that haven't received a ping in 30 seconds
             if current_time - (conn.last_ping or 0) > 30:
-                print(f"Connection {client_id} timed out")
+                logger.info("Connection %s timed out", client_id)
                 to_remove.append(client_id)
                 await conn.close()
             elif not await conn.send_ping():
-                print(f"Connection {client_id} is dead")
+                logger.info("Connection %s is dead", client_id)
                 to_remove.append(client_id)
         except Exception as e:
-            print(f"Error checking connection {client_id}: {e}")
+            logger.warning("Error checking connection %s: %s", client_id, e)
             to_remove.append(client_id)
     
     # Remove dead connections
     for client_id in to_remove:
         websocket_connections.pop(client_id, None)
     
-    print(f"Active connections: {len(websocket_connections)}")
+    logger.debug("Active connections: %d", len(websocket_connections))
 
 class FileTreeItem(BaseModel):
     name: str
@@ -253,12 +303,15 @@ class AIAnalysisRequest(BaseModel):
 class FileWriteRequest(BaseModel):
     path: str
     content: str
+    # None means unknown: content is sniffed for Excel/CSV JSON before parsing
+    file_type: Optional[Literal['text', 'excel', 'csv']] = None
 
     model_config = ConfigDict(
         json_schema_extra = {
             "example": {
                 "path": "/path/to/file.txt",
-                "content": "New file content"
+                "content": "New file content",
+                "file_type": "text"
             }
         }
     )
@@ -295,7 +348,7 @@ class FileWatcher(FileSystemEventHandler):
         
         # Ignore if this file was recently saved by web app
         if self.is_recently_web_saved(file_path):
-            print(f"Ignoring FileWatcher event for web-saved file: {file_path}")
+            logger.debug("Ignoring FileWatcher event for web-saved file: %s", file_path)
             return
             
         # Prevent duplicate events (filesystem can fire multiple events for one change)
@@ -306,7 +359,7 @@ class FileWatcher(FileSystemEventHandler):
         
         self.last_event_time[file_path] = current_time
         
-        print(f"External file change detected: {file_path}")
+        logger.info("External file change detected: %s", file_path)
         
         # Notify all connected clients about external file change
         message = {
@@ -321,13 +374,11 @@ class FileWatcher(FileSystemEventHandler):
         if global_event_loop and not global_event_loop.is_closed():
             try:
                 asyncio.run_coroutine_threadsafe(broadcast_to_websockets(message), global_event_loop)
-                print("File change broadcasted successfully via global event loop")
+                logger.debug("File change broadcasted successfully via global event loop")
             except Exception as e:
-                print(f"Error broadcasting file change: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error broadcasting file change: %s", e)
         else:
-            print(f"No event loop available for broadcasting (global_event_loop: {global_event_loop})")
+            logger.warning("No event loop available for broadcasting (global_event_loop: %s)", global_event_loop)
     
     def on_created(self, event):
         if not event.is_directory:
@@ -336,7 +387,7 @@ class FileWatcher(FileSystemEventHandler):
     def on_deleted(self, event):
         if not event.is_directory:
             # For deleted files, always notify (no web app involvement in deletion)
-            print(f"File deleted externally: {event.src_path}")
+            logger.info("File deleted externally: %s", event.src_path)
             message = {
                 "type": "file_deleted", 
                 "path": event.src_path,
@@ -348,13 +399,11 @@ class FileWatcher(FileSystemEventHandler):
             if global_event_loop and not global_event_loop.is_closed():
                 try:
                     asyncio.run_coroutine_threadsafe(broadcast_to_websockets(message), global_event_loop)
-                    print("File deletion broadcasted via global event loop")
+                    logger.debug("File deletion broadcasted via global event loop")
                 except Exception as e:
-                    print(f"Error broadcasting file deletion: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("Error broadcasting file deletion: %s", e)
             else:
-                print(f"No event loop available for broadcasting deletion (global_event_loop: {global_event_loop})")
+                logger.warning("No event loop available for broadcasting deletion (global_event_loop: %s)", global_event_loop)
     
     def on_moved(self, event):
         if not event.is_directory:
@@ -364,7 +413,7 @@ class FileWatcher(FileSystemEventHandler):
         """Mark file as recently saved by web app to ignore next FileWatcher event"""
         current_time = time.time()
         self.recently_saved_by_web[file_path] = current_time
-        print(f"Marked as web-saved: {file_path}")
+        logger.debug("Marked as web-saved: %s", file_path)
     
     def is_recently_web_saved(self, file_path: str) -> bool:
         """Check if file was recently saved by web app (within 2 seconds)"""
@@ -443,69 +492,81 @@ global_event_loop_lock = threading.Lock()
 file_watcher = FileWatcher()
 observer = Observer()
 
-def is_text_file(file_path: str) -> bool:
-    """Check if file is text or binary"""
-    # Get file extension
-    file_extension = os.path.splitext(file_path)[1].lower()
-    
-    # Common text file extensions
-    text_extensions = {
-        '.txt', '.md', '.py', '.js', '.jsx', '.ts', '.tsx', '.html', '.htm',
-        '.css', '.scss', '.sass', '.json', '.xml', '.yaml', '.yml', '.toml',
-        '.ini', '.cfg', '.conf', '.log', '.sql', '.sh', '.bash', '.zsh',
-        '.php', '.rb', '.go', '.rs', '.java', '.c', '.cpp', '.h', '.hpp',
-        '.cs', '.kt', '.swift', '.m', '.mm', '.vue', '.svelte', '.r', '.R',
-        '.dockerfile', '.gitignore', '.gitattributes', '.env', '.editorconfig',
-        '.prettierrc', '.eslintrc', '.babelrc', '.npmrc', '.yarnrc'
-    }
-    
-    # Check by extension first
-    if file_extension in text_extensions:
-        return True
-    
-    # For files without extension or unknown extensions, try to read as text
+# Common text file extensions
+TEXT_EXTENSIONS = {
+    '.txt', '.md', '.py', '.js', '.jsx', '.ts', '.tsx', '.html', '.htm',
+    '.css', '.scss', '.sass', '.json', '.xml', '.yaml', '.yml', '.toml',
+    '.ini', '.cfg', '.conf', '.log', '.sql', '.sh', '.bash', '.zsh',
+    '.php', '.rb', '.go', '.rs', '.java', '.c', '.cpp', '.h', '.hpp',
+    '.cs', '.kt', '.swift', '.m', '.mm', '.vue', '.svelte', '.r', '.R',
+    '.dockerfile', '.gitignore', '.gitattributes', '.env', '.editorconfig',
+    '.prettierrc', '.eslintrc', '.babelrc', '.npmrc', '.yarnrc'
+}
+EXCEL_EXTENSIONS = {'.xlsx', '.xls', '.xlsm', '.xlsb'}
+
+def _sniff_text(file_path: str) -> bool:
+    """Try to read the head of a file as UTF-8 text"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             # Read first 8KB to detect binary content
             chunk = f.read(8192)
             # Check for null bytes which typically indicate binary files
-            if '\0' in chunk:
-                return False
-            return True
+            return '\0' not in chunk
     except (UnicodeDecodeError, PermissionError):
         return False
 
+def classify_file(file_path: str) -> str:
+    """Classify file as 'image', 'excel', 'csv', 'text' or 'binary'.
+    Extension and mime type are computed once per call.
+    """
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension in EXCEL_EXTENSIONS:
+        return 'excel'
+    if file_extension == '.csv':
+        return 'csv'
+    if file_extension in TEXT_EXTENSIONS:
+        return 'text'
+    mime_type, _ = mimetypes.guess_type(file_path)
+    if mime_type and mime_type.startswith('image/'):
+        return 'image'
+    # For files without extension or unknown extensions, try to read as text
+    return 'text' if _sniff_text(file_path) else 'binary'
+
+def is_text_file(file_path: str) -> bool:
+    """Check if file is text or binary"""
+    return classify_file(file_path) == 'text'
+
 def is_excel_file(file_path: str) -> bool:
     """Check if file is an Excel file"""
-    file_extension = os.path.splitext(file_path)[1].lower()
-    return file_extension in ['.xlsx', '.xls', '.xlsm', '.xlsb']
+    return os.path.splitext(file_path)[1].lower() in EXCEL_EXTENSIONS
 
 def is_csv_file(file_path: str) -> bool:
     """Check if file is a CSV file"""
-    file_extension = os.path.splitext(file_path)[1].lower()
-    return file_extension == '.csv'
+    return os.path.splitext(file_path)[1].lower() == '.csv'
 
 def read_excel_file(file_path: str) -> dict:
     """Read Excel file and convert to JSON format"""
     try:
-        # Read Excel file
-        excel_file = pd.ExcelFile(file_path)
-        sheets_data = {}
-        
-        for sheet_name in excel_file.sheet_names:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-            # Replace NaN with None for JSON serialization
-            df = df.where(pd.notnull(df), None)
-            # Convert to dict format
-            sheets_data[sheet_name] = {
-                'columns': df.columns.tolist(),
-                'data': df.values.tolist()
-            }
+        # Open the workbook once and parse every sheet from the same handle
+        # instead of re-reading the zip container per sheet
+        with pd.ExcelFile(file_path) as excel_file:
+            sheet_names = excel_file.sheet_names
+            sheets_data = {}
+            
+            for sheet_name in sheet_names:
+                df = excel_file.parse(sheet_name)
+                # Replace NaN with None for JSON serialization
+                df = df.where(pd.notnull(df), None)
+                # Convert to dict format
+                sheets_data[sheet_name] = {
+                    'columns': df.columns.tolist(),
+                    'data': df.values.tolist()
+                }
         
         return {
             'type': 'excel',
             'sheets': sheets_data,
-            'sheet_names': excel_file.sheet_names
+            'sheet_names': sheet_names
         }
     except Exception as e:
         raise Exception(f"Error reading Excel file: {str(e)}")
@@ -545,18 +606,20 @@ def build_file_tree(directory: str, max_depth: int = 10, current_depth: int = 0)
     
     items = []
     try:
-        for item in sorted(os.listdir(directory)):
-            if item.startswith('.'):  # Skip hidden files
+        # scandir caches d_type, so is_dir() needs no extra stat per entry
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            if entry.name.startswith('.'):  # Skip hidden files
                 continue
             
-            item_path = os.path.join(directory, item)
-            is_dir = os.path.isdir(item_path)
+            is_dir = entry.is_dir()
             
             tree_item = FileTreeItem(
-                name=item,
-                path=item_path,
+                name=entry.name,
+                path=entry.path,
                 is_directory=is_dir,
-                children=build_file_tree(item_path, max_depth, current_depth + 1) if is_dir else None
+                children=build_file_tree(entry.path, max_depth, current_depth + 1) if is_dir else None
             )
             items.append(tree_item)
     except PermissionError:
@@ -569,6 +632,15 @@ try:
 except Exception:
     from backend.tools.data_analysis import intelligent_data_visualization  # type: ignore
 
+# Visualization reads data with pandas and renders with matplotlib (CPU-bound, GIL-heavy),
+# so it runs in worker processes to keep the event loop responsive
+_viz_pool = concurrent.futures.ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // 2))
+
+@app.on_event("shutdown")
+async def shutdown_viz_pool():
+    """Stop visualization worker processes"""
+    _viz_pool.shutdown(wait=False, cancel_futures=True)
+
 @app.post("/api/visualize-data")
 async def visualize_data(file_path: str):
     """
@@ -581,7 +653,7 @@ async def visualize_data(file_path: str):
         Visualization details or error message
     """
     try:
-        result = intelligent_data_visualization(file_path)
+        result = await asyncio.get_running_loop().run_in_executor(_viz_pool, intelligent_data_visualization, file_path)
         
         if result:
             return {
@@ -597,6 +669,62 @@ async def visualize_data(file_path: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Background visualizations by task id; a finished task is dropped once its result is fetched,
+# or after VIS_TASK_TTL seconds if nobody polls for it
+VIS_TASK_TTL = 600
+_VIS_TASKS: Dict[str, asyncio.Future] = {}
+_VIS_TASKS_FINISHED: Dict[str, float] = {}  # task id -> monotonic finish time, in finish order
+
+def _prune_vis_tasks() -> None:
+    cutoff = time.monotonic() - VIS_TASK_TTL
+    for task_id, finished_at in list(_VIS_TASKS_FINISHED.items()):
+        if finished_at >= cutoff:
+            break
+        del _VIS_TASKS_FINISHED[task_id]
+        _VIS_TASKS.pop(task_id, None)
+
+@app.post("/api/visualize-data/submit")
+async def submit_visualization(file_path: str):
+    """Start a visualization in the worker pool and return its task id without waiting"""
+    _prune_vis_tasks()
+    task_id = uuid.uuid4().hex
+    task = asyncio.get_running_loop().run_in_executor(
+        _viz_pool, intelligent_data_visualization, file_path
+    )
+    task.add_done_callback(lambda _: _VIS_TASKS_FINISHED.__setitem__(task_id, time.monotonic()))
+    _VIS_TASKS[task_id] = task
+    return {"task_id": task_id, "status": "pending"}
+
+@app.get("/api/visualize-data/{task_id}")
+async def get_visualization_result(task_id: str):
+    """Poll a submitted visualization: pending, success or error"""
+    task = _VIS_TASKS.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Unknown visualization task")
+    if not task.done():
+        return {"task_id": task_id, "status": "pending"}
+    _VIS_TASKS.pop(task_id, None)
+    _VIS_TASKS_FINISHED.pop(task_id, None)
+    
+    if task.cancelled():
+        message = "Visualization was cancelled"
+    elif task.exception() is not None:
+        message = str(task.exception())
+    elif not task.result():
+        message = "Unable to generate visualization"
+    else:
+        message = None
+    if message is not None:
+        return {"task_id": task_id, "status": "error", "message": message}
+    
+    result = task.result()
+    return {
+        "task_id": task_id,
+        "status": "success",
+        "chart_path": result['chart_path'],
+        "strategy": result.get('strategy', 'Default visualization')
+    }
+
 
 @app.get("/")
 async def root():
@@ -610,9 +738,9 @@ async def open_directory(request: OpenDirectoryRequest):
     """Open directory and return file tree"""
     directory_path = request.path
     
-    print(f"Opening directory: {directory_path}")
+    logger.info("Opening directory: %s", directory_path)
     if not directory_path:
-        print("Error: Directory path is empty")
+        logger.warning("Error: Directory path is empty")
         raise HTTPException(status_code=400, detail="Directory path is empty")
     
     # Handle paths
@@ -639,29 +767,35 @@ async def open_directory(request: OpenDirectoryRequest):
                             "Wasn't that a dainty dish to set before the king?\n"
                         )
                 except Exception as e:
-                    print(f"Failed to create sample dir: {e}")
+                    logger.warning("Failed to create sample dir: %s", e)
         directory_path = os.path.abspath(os.path.join(project_root, directory_path))
     
-    print(f"Absolute path: {directory_path}")
-    print(f"Current working directory: {os.getcwd()}")
-    print(f"Directory exists: {os.path.exists(directory_path)}")
-    print(f"Is directory: {os.path.isdir(directory_path)}")
-    print(f"Directory contents: {os.listdir(directory_path) if os.path.exists(directory_path) and os.path.isdir(directory_path) else 'N/A'}")
+    logger.debug("Absolute path: %s", directory_path)
+    
+    # Single stat off the event loop instead of separate exists/isdir/listdir calls
+    try:
+        st = await asyncio.to_thread(os.stat, directory_path)
+    except OSError:
+        st = None
     
-    if not os.path.exists(directory_path):
-        print(f"Error: Directory does not exist: {directory_path}")
+    if st is None:
+        logger.warning("Error: Directory does not exist: %s", directory_path)
         raise HTTPException(status_code=400, detail=f"Directory does not exist: {directory_path}")
     
-    if not os.path.isdir(directory_path):
+    if not stat.S_ISDIR(st.st_mode):
         raise HTTPException(status_code=400, detail="Path is not a directory")
     
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Current working directory: %s", os.getcwd())
+        logger.debug("Directory contents: %s", os.listdir(directory_path))
+    
     try:
         # Start watching this directory
         if directory_path not in file_watcher.watched_paths:
             observer.schedule(file_watcher, directory_path, recursive=True)
             file_watcher.watched_paths.add(directory_path)
         
-        file_tree = build_file_tree(directory_path)
+        file_tree = await asyncio.to_thread(build_file_tree, directory_path)
         return {"tree": file_tree, "root_path": directory_path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading directory: {str(e)}")
@@ -717,15 +851,14 @@ async def get_file_content(path: str):
         raise HTTPException(status_code=400, detail="Path is a directory")
     
     try:
-        # Check if it's an image
-        import mimetypes
-        mime_type, _ = mimetypes.guess_type(path)
-        if mime_type and mime_type.startswith('image/'):
+        file_type = classify_file(path)
+        if file_type == 'image':
             # Images are returned directly as files
+            mime_type, _ = mimetypes.guess_type(path)
             return FileResponse(path, media_type=mime_type)
             
         # Check if it's an Excel file
-        if is_excel_file(path):
+        if file_type == 'excel':
             excel_data = read_excel_file(path)
             return {
                 "path": path,
@@ -734,7 +867,7 @@ async def get_file_content(path: str):
                 "file_type": "excel"
             }
         # Check if it's a CSV file
-        elif is_csv_file(path):
+        elif file_type == 'csv':
             csv_data = read_csv_file(path)
             return {
                 "path": path,
@@ -743,7 +876,7 @@ async def get_file_content(path: str):
                 "file_type": "csv"
             }
         # Check if it's a text file
-        elif is_text_file(path):
+        elif file_type == 'text':
             async with aiofiles.open(path, mode='r', encoding='utf-8') as f:
                 content = await f.read()
             return FileContent(path=path, content=content, is_binary=False)
@@ -764,7 +897,6 @@ async def download_raw_file(path: str):
     if not os.path.exists(path) or os.path.isdir(path):
         raise HTTPException(status_code=404, detail="File not found")
     try:
-        import mimetypes
         mime_type, _ = mimetypes.guess_type(path)
         return FileResponse(path, media_type=mime_type or 'application/octet-stream', filename=os.path.basename(path))
     except Exception as e:
@@ -802,21 +934,24 @@ async def archive_directory(path: str):
 async def write_file(request: FileWriteRequest):
     """Write content to file"""
     try:
-        print(f"Saving file: {request.path}")
-        print(f"Content length: {len(request.content)} characters")
+        logger.debug("Saving file: %s (%d characters)", request.path, len(request.content))
         
         # Get directory path
         dir_path = os.path.dirname(request.path)
-        print(f"Directory: {dir_path}")
         
         # Create directory if it doesn't exist (but only if dir_path is not empty)
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
-            print(f"Directory created/exists: {dir_path}")
         
-        # Check if this is Excel/CSV data
+        # Check if this is Excel/CSV data. Plain text saves skip the JSON parse entirely;
+        # without an explicit file_type only a cheap prefix check gates json.loads
+        content = request.content
+        if request.file_type is None:
+            might_be_table = content[:1] == '{' and '"type"' in content[:256]
+        else:
+            might_be_table = request.file_type in ('excel', 'csv')
         try:
-            data = json.loads(request.content)
+            data = json.loads(content) if might_be_table else None
             if isinstance(data, dict) and 'type' in data:
                 if data['type'] == 'excel' and 'sheets' in data:
                     # Save as Excel file
@@ -824,14 +959,14 @@ async def write_file(request: FileWriteRequest):
                         for sheet_name, sheet_data in data['sheets'].items():
                             df = pd.DataFrame(sheet_data['data'], columns=sheet_data['columns'])
                             df.to_excel(writer, sheet_name=sheet_name, index=False)
-                    print(f"Excel file saved successfully: {request.path}")
+                    logger.debug("Excel file saved successfully: %s", request.path)
                     file_watcher.mark_as_web_saved(request.path)
                     return {"success": True, "message": "Excel file saved successfully"}
                 elif data['type'] == 'csv':
                     # Save as CSV file
                     df = pd.DataFrame(data['data'], columns=data['columns'])
                     df.to_csv(request.path, index=False)
-                    print(f"CSV file saved successfully: {request.path}")
+                    logger.debug("CSV file saved successfully: %s", request.path)
                     file_watcher.mark_as_web_saved(request.path)
                     return {"success": True, "message": "CSV file saved successfully"}
         except (json.JSONDecodeError, KeyError):
@@ -842,12 +977,10 @@ async def write_file(request: FileWriteRequest):
         async with aiofiles.open(request.path, mode='w', encoding='utf-8') as f:
             await f.write(request.content)
         
-        print(f"File saved successfully: {request.path}")
+        logger.debug("File saved successfully: %s", request.path)
         
         # Mark file as saved by web app to prevent FileWatcher false positives
-        print(f"Calling mark_as_web_saved for: {request.path}")
         file_watcher.mark_as_web_saved(request.path)
-        print(f"mark_as_web_saved completed")
         
         return {"success": True, "message": "File saved successfully"}
     except Exception as e:
@@ -858,15 +991,15 @@ async def pick_directory_api(test_mode: bool = False):
     """Open system folder picker dialog (native), returns selected absolute path.
     test_mode=True will return repository test-directory for convenience.
     """
-    print(f"/api/pick-directory called, test_mode={test_mode}")
+    logger.info("/api/pick-directory called, test_mode=%s", test_mode)
     if test_mode:
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         test_dir = os.path.join(project_root, "test-directory")
-        print(f"Returning test directory: {test_dir}")
+        logger.debug("Returning test directory: %s", test_dir)
         return {"path": test_dir, "success": True}
     try:
         # On macOS prefer AppleScript (proved working earlier); otherwise use Tkinter
-        if platform.system() == "Darwin":  # macOS AppleScript first
+        if _SYSTEM == "Darwin":  # macOS AppleScript first
             applescript = '''
             tell application "System Events"
                 activate
@@ -875,16 +1008,16 @@ async def pick_directory_api(test_mode: bool = False):
             return POSIX path of selectedFolder
             '''
             result = subprocess.run(['osascript', '-e', applescript], capture_output=True, text=True, timeout=60)
-            print(f"AppleScript exit={result.returncode}, out='{result.stdout.strip()}', err='{result.stderr.strip()}'")
+            logger.debug("AppleScript exit=%s, out='%s', err='%s'", result.returncode, result.stdout.strip(), result.stderr.strip())
             if result.returncode == 0:
                 folder_path = result.stdout.strip()
                 if folder_path:
                     folder_path = os.path.abspath(folder_path.replace('\\ ', ' '))
-                    print(f"Selected folder: {folder_path}")
+                    logger.info("Selected folder: %s", folder_path)
                     return {"path": folder_path, "success": True}
                 return {"path": None, "success": False, "message": "User cancelled"}
             if result.returncode == 1:
-                print("User cancelled folder picker")
+                logger.info("User cancelled folder picker")
                 return {"path": None, "success": False, "message": "User cancelled"}
             # If AppleScript fails, try Tkinter as fallback
             if HAS_TKINTER:
@@ -893,12 +1026,12 @@ async def pick_directory_api(test_mode: bool = False):
                     folder_path = filedialog.askdirectory(title="Select Folder", initialdir=os.getcwd())
                     root.destroy()
                     if folder_path:
-                        print(f"Selected folder (tk fallback): {folder_path}")
+                        logger.info("Selected folder (tk fallback): %s", folder_path)
                         return {"path": os.path.abspath(folder_path), "success": True}
-                    print("User cancelled folder picker (tk)")
+                    logger.info("User cancelled folder picker (tk)")
                     return {"path": None, "success": False, "message": "User cancelled"}
                 except Exception as te:
-                    print(f"Tkinter fallback error: {te}")
+                    logger.warning("Tkinter fallback error: %s", te)
             raise Exception(result.stderr)
 
         # Non-macOS platforms: use Tkinter if available
@@ -907,17 +1040,17 @@ async def pick_directory_api(test_mode: bool = False):
             folder_path = filedialog.askdirectory(title="Select Folder", initialdir=os.getcwd())
             root.destroy()
             if folder_path:
-                print(f"Selected folder (tk): {folder_path}")
+                logger.info("Selected folder (tk): %s", folder_path)
                 return {"path": os.path.abspath(folder_path), "success": True}
             return {"path": None, "success": False, "message": "User cancelled"}
 
         # No picker available
         raise HTTPException(status_code=501, detail="System folder picker not available")
     except subprocess.TimeoutExpired:
-        print("Folder picker timeout")
+        logger.warning("Folder picker timeout")
         return {"path": None, "success": False, "message": "Dialog timeout"}
     except Exception as e:
-        print(f"Folder picker error: {e}")
+        logger.error("Folder picker error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error opening folder picker: {str(e)}")
 
 @app.post("/api/open-file")
@@ -932,9 +1065,6 @@ async def open_file(request: FileReadRequest):
         dict: Status of file opening operation
     """
     try:
-        import subprocess
-        import platform
-        
         path = request.path
         
         # Normalize path to absolute
@@ -942,18 +1072,21 @@ async def open_file(request: FileReadRequest):
             path = os.path.abspath(path)
         
         # Platform-specific file opening
-        system = platform.system()
-        if system == "Darwin":  # macOS
-            subprocess.run(["open", path], check=True)
-        elif system == "Windows":
+        if _OPEN_CMD is None:  # Windows
             os.startfile(path)
-        else:  # Linux and other Unix-like systems
-            subprocess.run(["xdg-open", path], check=True)
+        else:
+            # Run in a worker thread so the event loop keeps serving WebSockets/SSE
+            await asyncio.to_thread(subprocess.run, [*_OPEN_CMD, path], check=True)
         
         return {"status": "success", "path": path}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+# Streamed thought types that may be batched into one write, and the batch limits
+SSE_COALESCE_TYPES = {"thinking_token"}
+SSE_FLUSH_BYTES = 4096
+SSE_FLUSH_INTERVAL = 0.016  # seconds
+
 @app.post("/api/ai/analyze")
 async def analyze_with_ai(request: AIAnalysisRequest):
     """
@@ -969,23 +1102,63 @@ async def analyze_with_ai(request: AIAnalysisRequest):
         
         async def generate_stream():
             """Generate streaming response"""
-            async for thought in agent.analyze(
+            # High-frequency token events are coalesced so several frames share one send.
+            # The next thought is awaited as a task so a partial batch still goes out once
+            # SSE_FLUSH_INTERVAL passes, even while the agent is quiet.
+            thoughts = agent.analyze(
                 request.query,
                 request.project_path,
                 reset_context,
                 request.file_paths,
-            ):
-                # Format as Server-Sent Events
-                data = json.dumps(thought)
-                yield f"data: {data}\n\n"
+            ).__aiter__()
+            buf = bytearray()
+            batch_started = 0.0  # when the oldest buffered frame arrived
+            pending = None
+            try:
+                while True:
+                    if pending is None:
+                        pending = asyncio.ensure_future(thoughts.__anext__())
+                    if buf:
+                        remaining = batch_started + SSE_FLUSH_INTERVAL - time.monotonic()
+                        done, _ = await asyncio.wait({pending}, timeout=max(remaining, 0))
+                        if not done:
+                            yield bytes(buf)
+                            buf.clear()
+                            continue
+                    try:
+                        thought = await pending
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        pending = None
+                    # Format as Server-Sent Events; bytes go to the ASGI send without re-encoding
+                    frame = b"data: %b\n\n" % _dumps(thought)
+                    if isinstance(thought, dict) and thought.get("type") in SSE_COALESCE_TYPES:
+                        if not buf:
+                            batch_started = time.monotonic()
+                        buf += frame
+                        if len(buf) >= SSE_FLUSH_BYTES:
+                            yield bytes(buf)
+                            buf.clear()
+                        continue
+                    # Other thought types flush pending tokens and go out immediately
+                    if buf:
+                        frame = bytes(buf) + frame
+                        buf.clear()
+                    yield frame
+            finally:
+                if pending is not None:
+                    pending.cancel()
+            if buf:
+                yield bytes(buf)
         
         return StreamingResponse(
             generate_stream(),
-            media_type="text/plain",
+            media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
-                "Content-Type": "text/plain; charset=utf-8"
+                "X-Accel-Buffering": "no"
             }
         )
         
@@ -1007,33 +1180,39 @@ async def test_ai():
     except Exception as e:
         return {"status": "error", "message": f"AI agent error: {str(e)}"}
 
+@lru_cache(maxsize=1)
+def _lib_versions() -> Dict[str, str]:
+    """AI library versions; constant for the process lifetime"""
+    versions = {}
+    try:
+        import langchain_anthropic
+        versions["langchain_anthropic_version"] = getattr(langchain_anthropic, '__version__', 'unknown')
+        versions["langchain_anthropic_location"] = langchain_anthropic.__file__
+    except:
+        versions["langchain_anthropic_version"] = "import_error"
+        
+    try:
+        import anthropic
+        versions["anthropic_version"] = getattr(anthropic, '__version__', 'unknown')
+    except:
+        versions["anthropic_version"] = "import_error"
+    return versions
+
 @app.get("/api/ai/info")
-async def get_ai_info():
-    """Get information about current AI agent configuration"""
+async def get_ai_info(verbose: bool = False):
+    """Get information about current AI agent configuration.
+    verbose=1 adds library versions (imports the LangChain/Anthropic stack).
+    """
     try:
-        try:
-            from .ai_agent_manager import get_agent_info  # type: ignore
-        except Exception:
-            from backend.ai_agent_manager import get_agent_info  # type: ignore
         agent = get_ai_agent()
         info = get_agent_info()
         info["agent_class"] = type(agent).__name__
         
+        if not verbose:
+            return info
+        
         # Add library versions for debugging
-        try:
-            import langchain_anthropic
-            info["langchain_anthropic_version"] = getattr(langchain_anthropic, '__version__', 'unknown')
-            info["langchain_anthropic_location"] = langchain_anthropic.__file__
-        except:
-            info["langchain_anthropic_version"] = "import_error"
-            
-        try:
-            import anthropic
-            info["anthropic_version"] = getattr(anthropic, '__version__', 'unknown')
-        except:
-            info["anthropic_version"] = "import_error"
-            
-        return info
+        return {**info, **_lib_versions()}
     except Exception as e:
         return {"status": "error", "message": f"AI agent info error: {str(e)}"}
 
@@ -1058,62 +1237,64 @@ async def reset_all_sessions():
     except Exception as e:
         return {"status": "error", "message": f"Error resetting sessions: {str(e)}"}
 
-@app.get("/api/ai/info")
-async def get_ai_agent_info():
-    """Get information about current AI agent configuration"""
-    return get_agent_info()
-
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time file synchronization"""
-    print("WebSocket connection attempt...")
     # Generate unique client ID based on remote address and a random component
     client_id = f"{websocket.client.host}:{websocket.client.port}:{id(websocket)}"
-    print(f"Client ID: {client_id}")
+    logger.debug("WebSocket connection attempt from %s", client_id)
     
     # Run cleanup before accepting new connection
     await cleanup_old_connections()
     
     # Check if we have room for new connection
     if len(websocket_connections) >= MAX_WEBSOCKET_CONNECTIONS:
-        print(f"Rejecting connection from {client_id} - too many connections")
+        logger.warning("Rejecting connection from %s - too many connections", client_id)
         await websocket.close(code=1008, reason="Too many connections")
         return
     
     # Accept the connection
-    print("Accepting WebSocket connection...")
     await websocket.accept()
-    print("WebSocket connection accepted!")
     
     # Set global event loop for FileWatcher
+    # (double-checked: the lock is only taken while the loop is still unset)
     global global_event_loop
-    with global_event_loop_lock:
-        print(f"Current global_event_loop: {global_event_loop}")
-        if global_event_loop is None:
-            try:
-                global_event_loop = asyncio.get_event_loop()
-                print(f"Global event loop set for FileWatcher via WebSocket: {global_event_loop}")
-            except Exception as e:
-                print(f"Error setting global event loop: {e}")
-        else:
-            print(f"Global event loop already set for FileWatcher: {global_event_loop}")
+    if global_event_loop is None:
+        with global_event_loop_lock:
+            if global_event_loop is None:
+                try:
+                    global_event_loop = asyncio.get_running_loop()
+                    logger.info("Global event loop set for FileWatcher via WebSocket: %s", global_event_loop)
+                except Exception as e:
+                    logger.error("Error setting global event loop: %s", e)
     
     # Create new connection object
     conn = WebSocketConnection(websocket, client_id)
     websocket_connections[client_id] = conn
-    print(f"New WebSocket connection from {client_id}")
+    logger.debug("New WebSocket connection from %s", client_id)
     
     try:
         # Send initial ping
         if not await conn.send_ping():
-            print(f"Failed to send initial ping to {client_id}")
+            logger.warning("Failed to send initial ping to %s", client_id)
             return
             
         while True:
             try:
-                # Wait for messages
-                data = await websocket.receive_text()
-                message = json.loads(data)
+                # Wait for messages (browsers send text frames; bytes frames are accepted too)
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", 1000))
+                data = frame.get("bytes")
+                if data is None:
+                    data = (frame.get("text") or "").encode()
+                
+                # Fast path for keep-alive pongs: no JSON parse needed
+                if len(data) < 64 and (b'"type":"pong"' in data or b'"type": "pong"' in data):
+                    conn.last_ping = time.time()
+                    continue
+                
+                message = _loads(data)
                 
                 # Handle different message types
                 if message.get("type") == "pong":
@@ -1123,7 +1304,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     # Simple tab-to-tab synchronization (manual trigger)
                     file_path = message.get("path")
                     if file_path:
-                        print(f"🔄 Tab sync request for: {file_path}")
+                        logger.debug("Tab sync request for: %s", file_path)
                         await broadcast_to_websockets({
                             "type": "sync_tabs",
                             "path": file_path,
@@ -1131,20 +1312,18 @@ async def websocket_endpoint(websocket: WebSocket):
                         }, exclude_client=client_id)  # Don't send back to sender
                 
             except WebSocketDisconnect:
-                print(f"WebSocket disconnected: {client_id}")
+                logger.debug("WebSocket disconnected: %s", client_id)
                 break
             except Exception as e:
-                print(f"Error processing message from {client_id}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error processing message from %s: %s", client_id, e)
                 break
                 
     finally:
         # Clean up on exit
-        if client_id in websocket_connections:
-            await websocket_connections[client_id].close()
-            websocket_connections.pop(client_id, None)
-        print(f"Connection closed: {client_id}")
+        existing = websocket_connections.pop(client_id, None)
+        if existing is not None:
+            await existing.close()
+        logger.debug("Connection closed: %s", client_id)
     
 
 
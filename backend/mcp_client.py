@@ -3,19 +3,27 @@ Later can be replaced by stdio/WebSocket transport.
 """
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from .mcp_server import MCPServer, MCPResponse, get_default_server
 
 
 class MCPClient:
     def __init__(self, server: Optional[MCPServer] = None, project_root: Optional[str] = None):
         self.server = server or get_default_server(project_root)
+        # Whitelisted tools; request() cannot reach any other server attribute
+        self._tools: Dict[str, Callable[..., MCPResponse]] = {
+            "fs_list_directory": self.server.fs_list_directory,
+            "fs_read_file": self.server.fs_read_file,
+            "fs_write_file": self.server.fs_write_file,
+            "fs_search_files": self.server.fs_search_files,
+            "exec_run_python": self.server.exec_run_python,
+        }
 
     # Generic request
     def request(self, tool_name: str, args: Dict[str, Any]) -> MCPResponse:
-        if not hasattr(self.server, tool_name):
+        fn = self._tools.get(tool_name)
+        if fn is None:
             return MCPResponse(False, error=f"Tool not found: {tool_name}")
-        fn = getattr(self.server, tool_name)
         return fn(**args)
 
     # Helpers
@@ -5,16 +5,67 @@ Minimal in-process MCP-like server (MVP)
 """
 from __future__ import annotations
 
+import io
 import os
+import functools
+import stat
 import time
 import json
+import threading
 import traceback
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+import matplotlib
+matplotlib.use('Agg')  # headless backend, selected once at import
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import numpy as np
 import pandas as pd
 
 
+# Upper bound for fs_read_file without an explicit max_bytes (whole file is held in memory twice: bytes + str)
+MAX_READ_BYTES = 8 * 1024 * 1024
+
+# Directories never worth descending into when searching by file name
+SEARCH_SKIP_DIRS = {'.git', 'node_modules', '__pycache__'}
+
+
+# exec_run_python changes the process-wide working directory for the executed code,
+# so executions (across all servers) run one at a time
+_exec_lock = threading.Lock()
+
+# Per-thread list of paths saved via Figure.savefig while exec_run_python code runs
+_savefig_sink = threading.local()
+_savefig_hook_lock = threading.Lock()
+_savefig_hook_installed = False
+
+
+def _install_savefig_hook() -> None:
+    """Wrap Figure.savefig once per process to record saved paths.
+    plt.savefig delegates to Figure.savefig, so this covers both. Paths go to the
+    calling thread's sink, so concurrent executions never see each other's outputs.
+    """
+    global _savefig_hook_installed
+    with _savefig_hook_lock:
+        if _savefig_hook_installed:
+            return
+        original_savefig = Figure.savefig
+
+        def savefig(self, fname, *args, **kwargs):
+            out = original_savefig(self, fname, *args, **kwargs)
+            outputs = getattr(_savefig_sink, "outputs", None)
+            if outputs is not None:
+                try:
+                    outputs.append(os.path.abspath(fname))
+                except Exception:
+                    pass
+            return out
+
+        Figure.savefig = savefig
+        _savefig_hook_installed = True
+
+
 @dataclass
 class MCPResponse:
     ok: bool
@@ -28,30 +79,37 @@ class MCPServer:
     def __init__(self, project_root: Optional[str] = None, output_dir: Optional[str] = None):
         self.project_root = os.path.abspath(project_root or os.getcwd())
         self.output_dir = os.path.abspath(output_dir or self.project_root)
+        # project_root with a trailing separator, so "/root-evil" does not match "/root"
+        self._root_prefix = os.path.join(self.project_root, "")
+
+    def _within_root(self, target: str) -> bool:
+        return target == self.project_root or target.startswith(self._root_prefix)
 
     # ===== Filesystem tools =====
     def fs_list_directory(self, path: Optional[str] = None) -> MCPResponse:
         try:
             target = os.path.abspath(path or self.project_root)
-            if not target.startswith(self.project_root):
+            if not self._within_root(target):
                 return MCPResponse(False, error="Path outside project_root is not allowed")
             if not os.path.exists(target):
                 return MCPResponse(False, error=f"Directory not found: {target}")
             if not os.path.isdir(target):
                 return MCPResponse(False, error=f"Not a directory: {target}")
             items = []
-            for name in sorted(os.listdir(target)):
-                p = os.path.join(target, name)
+            with os.scandir(target) as it:
+                entries = sorted(it, key=lambda e: e.name)
+            for e in entries:
                 try:
-                    stat = os.stat(p)
+                    st = e.stat()
+                    is_dir = e.is_dir()
                 except Exception:
                     continue
                 items.append({
-                    "name": name,
-                    "path": p,
-                    "is_dir": os.path.isdir(p),
-                    "size": stat.st_size,
-                    "mtime": int(stat.st_mtime),
+                    "name": e.name,
+                    "path": e.path,
+                    "is_dir": is_dir,
+                    "size": st.st_size,
+                    "mtime": int(st.st_mtime),
                 })
             return MCPResponse(True, {"path": target, "items": items})
         except Exception as e:
@@ -60,12 +118,19 @@ class MCPServer:
     def fs_read_file(self, path: str, max_bytes: Optional[int] = None) -> MCPResponse:
         try:
             target = os.path.abspath(path)
-            if not target.startswith(self.project_root):
+            if not self._within_root(target):
                 return MCPResponse(False, error="Path outside project_root is not allowed")
-            if not os.path.exists(target) or not os.path.isfile(target):
+            try:
+                st = os.stat(target)
+            except OSError:
+                st = None
+            if st is None or not stat.S_ISREG(st.st_mode):
                 return MCPResponse(False, error=f"File not found: {target}")
+            size = st.st_size
+            if not max_bytes and size > MAX_READ_BYTES:
+                return MCPResponse(False, error=f"File too large to read at once ({size} bytes > {MAX_READ_BYTES}); pass max_bytes")
             with open(target, 'rb') as f:
-                data = f.read(max_bytes) if max_bytes else f.read()
+                data = f.read(min(max_bytes, size) if max_bytes else size)
             try:
                 text = data.decode('utf-8')
                 return MCPResponse(True, {"path": target, "text": text})
@@ -78,7 +143,7 @@ class MCPServer:
     def fs_write_file(self, path: str, text: Optional[str] = None, content_base64: Optional[str] = None) -> MCPResponse:
         try:
             target = os.path.abspath(path)
-            if not target.startswith(self.project_root):
+            if not self._within_root(target):
                 return MCPResponse(False, error="Path outside project_root is not allowed")
             os.makedirs(os.path.dirname(target), exist_ok=True)
             if content_base64 is not None:
@@ -96,22 +161,34 @@ class MCPServer:
     def fs_search_files(self, query: str, root: Optional[str] = None, globs: Optional[List[str]] = None, limit: int = 50) -> MCPResponse:
         try:
             base = os.path.abspath(root or self.project_root)
-            if not base.startswith(self.project_root):
+            if not self._within_root(base):
                 return MCPResponse(False, error="Root outside project_root is not allowed")
             q = query.lower().strip()
             results = []
-            for r, _, files in os.walk(base):
-                for name in files:
-                    if name.startswith('~$'):
-                        continue
-                    if q in name.lower():
-                        p = os.path.join(r, name)
+            # Explicit DFS over scandir: DirEntry caches type/stat info, and the walk
+            # stops as soon as the limit is reached
+            stack = [base]
+            while stack:
+                try:
+                    it = os.scandir(stack.pop())
+                except OSError:
+                    continue
+                with it:
+                    for e in it:
+                        name = e.name
                         try:
-                            st = os.stat(p)
-                            results.append({"path": p, "size": st.st_size, "mtime": int(st.st_mtime)})
-                            if len(results) >= limit:
-                                return MCPResponse(True, {"matches": results})
-                        except Exception:
+                            if e.is_dir():
+                                if not e.is_symlink() and name not in SEARCH_SKIP_DIRS:
+                                    stack.append(e.path)
+                                continue
+                            if name.startswith('~$'):
+                                continue
+                            if q in name.lower():
+                                st = e.stat()
+                                results.append({"path": e.path, "size": st.st_size, "mtime": int(st.st_mtime)})
+                                if len(results) >= limit:
+                                    return MCPResponse(True, {"matches": results})
+                        except OSError:
                             continue
             return MCPResponse(True, {"matches": results})
         except Exception as e:
@@ -122,43 +199,16 @@ class MCPServer:
         """Execute Python with minimal sandbox and timeout.
         WARNING: MVP — relies on limited builtins and timeouts only.
         """
-        import io, sys, threading
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        from matplotlib.figure import Figure
-        import numpy as np
-
-        original_cwd = os.getcwd()
         try:
             wd = os.path.abspath(workdir or self.output_dir)
             # Allow workdir inside project_root or equal to it
-            if not wd.startswith(self.project_root):
+            if not self._within_root(wd):
                 return MCPResponse(False, error="workdir outside project_root is not allowed")
             os.makedirs(wd, exist_ok=True)
-            os.chdir(wd)
 
-            # Patch savefig to collect outputs
-            original_savefig = plt.savefig
+            # Collect savefig outputs for this call (see _install_savefig_hook)
+            _install_savefig_hook()
             outputs: List[str] = []
-            def _patched_savefig(fname, *args, **kwargs):
-                out = original_savefig(fname, *args, **kwargs)
-                try:
-                    outputs.append(os.path.abspath(fname))
-                except Exception:
-                    pass
-                return out
-            plt.savefig = _patched_savefig
-            original_fig_savefig = getattr(Figure, 'savefig', None)
-            if callable(original_fig_savefig):
-                def _patched_fig_savefig(self, fname, *args, **kwargs):
-                    out = original_fig_savefig(self, fname, *args, **kwargs)
-                    try:
-                        outputs.append(os.path.abspath(fname))
-                    except Exception:
-                        pass
-                    return out
-                Figure.savefig = _patched_fig_savefig
 
             # Prepare sandboxed globals
             allowed_globals = {
@@ -171,49 +221,50 @@ class MCPServer:
                 '__builtins__': __builtins__,
             }
 
+            # print() in the executed code writes to this call's buffer; sys.stdout/sys.stderr
+            # are left alone, so nothing else in the process is affected
             buffer = io.StringIO()
-            err_buffer = io.StringIO()
-            old_stdout, old_stderr = sys.stdout, sys.stderr
-            sys.stdout, sys.stderr = buffer, err_buffer
+            allowed_globals['print'] = functools.partial(print, file=buffer)
 
             exc: Dict[str, Any] = {}
             def _runner():
+                _savefig_sink.outputs = outputs
                 try:
                     exec(code, allowed_globals)
                 except Exception as e:
                     exc['err'] = e
                     exc['tb'] = traceback.format_exc()
+                finally:
+                    _savefig_sink.outputs = None
 
-            t = threading.Thread(target=_runner, daemon=True)
-            t.start()
-            t.join(timeout=timeout_sec)
-            timed_out = t.is_alive()
-            if timed_out:
+            # Time spent waiting for the lock does not count towards timeout_sec. On timeout
+            # the lock is released while the (daemon) thread may still run, so runaway code
+            # can't block later calls or keep the interpreter from exiting
+            with _exec_lock:
+                original_cwd = os.getcwd()
+                os.chdir(wd)
+                try:
+                    t = threading.Thread(target=_runner, name="mcp-exec", daemon=True)
+                    t.start()
+                    t.join(timeout=timeout_sec)
+                finally:
+                    os.chdir(original_cwd)
+            if t.is_alive():
                 return MCPResponse(False, error=f"Execution timeout after {timeout_sec}s")
             out = buffer.getvalue()
-            err = err_buffer.getvalue()
             if 'err' in exc:
                 return MCPResponse(False, error=f"{exc['err']}\n{exc.get('tb','')}")
-            # If outputs are relative paths, normalize to absolute within wd
+            # If outputs are relative paths, normalize to absolute within wd; only files
+            # saved under wd are reported
+            wd_prefix = os.path.join(wd, "")
             norm_outputs = []
             for p in outputs:
-                try:
-                    ap = p if os.path.isabs(p) else os.path.abspath(os.path.join(wd, p))
+                ap = p if os.path.isabs(p) else os.path.abspath(os.path.join(wd, p))
+                if ap.startswith(wd_prefix):
                     norm_outputs.append(ap)
-                except Exception:
-                    norm_outputs.append(p)
-            return MCPResponse(True, {"ok": True, "stdout": out, "stderr": err, "outputs": norm_outputs})
+            return MCPResponse(True, {"ok": True, "stdout": out, "stderr": "", "outputs": norm_outputs})
         except Exception as e:
             return MCPResponse(False, error=str(e))
-        finally:
-            try:
-                sys.stdout, sys.stderr = old_stdout, old_stderr  # type: ignore[name-defined]
-            except Exception:
-                pass
-            try:
-                os.chdir(original_cwd)
-            except Exception:
-                pass
 
 
 def get_default_server(project_root: Optional[str] = None) -> MCPServer:
@@ -12,45 +12,731 @@ Advanced data analysis and visualization tools
 Uses LangChain and AI for intelligent data processing
 """
 import os
+import mmap
+import threading
+import hashlib
+import time
+import warnings
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 from typing import Optional, Dict, Any
+from functools import lru_cache
+from itertools import islice
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# matplotlib and langchain_anthropic are imported lazily on the visualization path:
+# they are slow to import and nothing else needs them
+
+# Rust-based calamine parser is several times faster than openpyxl and also reads .xlsb
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE: Optional[str] = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = None  # let pandas pick (openpyxl for .xlsx, xlrd for .xls)
+
+_EXCEL_EXTENSIONS = ('.xls', '.xlsx', '.xlsb', '.ods')
+
+# Arrow's multithreaded CSV reader is used when pyarrow is installed
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# orjson parses straight from bytes/buffers and is several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Below this size a plain read beats setting up a memory map
+_MMAP_MIN_BYTES = 64 * 1024
+
+
+def _load_json(file_path: str) -> Any:
+    """Parse a JSON file, memory-mapping large files when orjson can read the buffer directly"""
+    with open(file_path, 'rb') as f:
+        if orjson is None:
+            return json.loads(f.read())
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+# Opt-in Polars engine for aggregate_data (DATA_ANALYSIS_ENGINE=polars); pandas otherwise
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# pandas metric name -> Polars expression method
+_POLARS_METRICS = {
+    "mean": "mean", "sum": "sum", "count": "count", "min": "min", "max": "max",
+    "median": "median", "std": "std", "var": "var", "first": "first", "last": "last",
+    "nunique": "n_unique",
+}
+
+
+def _use_polars() -> bool:
+    return pl is not None and os.environ.get("DATA_ANALYSIS_ENGINE", "").lower() == "polars"
+
+
+# Opt-in Numba groupby kernel for aggregate_data (DATA_ANALYSIS_ENGINE=numba)
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+_NUMBA_METRICS = {"sum", "count", "min", "max", "mean"}
+# Below this many rows the JIT compile costs more than pandas' groupby
+_NUMBA_MIN_ROWS = 100_000
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _groupby_kernel(codes, vals, n_groups):
+        """Per-group sum/count/min/max of each column in one pass; columns run in parallel.
+        Rows with a negative code (null key) or a NaN value are skipped.
+        """
+        n_rows, n_cols = vals.shape
+        sums = np.zeros((n_groups, n_cols))
+        counts = np.zeros((n_groups, n_cols), dtype=np.int64)
+        mins = np.full((n_groups, n_cols), np.inf)
+        maxs = np.full((n_groups, n_cols), -np.inf)
+        for j in prange(n_cols):
+            for i in range(n_rows):
+                g = codes[i]
+                v = vals[i, j]
+                if g < 0 or np.isnan(v):
+                    continue
+                sums[g, j] += v
+                counts[g, j] += 1
+                if v < mins[g, j]:
+                    mins[g, j] = v
+                if v > maxs[g, j]:
+                    maxs[g, j] = v
+        return sums, counts, mins, maxs
+
+
+def _use_numba() -> bool:
+    return njit is not None and os.environ.get("DATA_ANALYSIS_ENGINE", "").lower() == "numba"
+
+
+def _numba_aggregate(df: pd.DataFrame, keys: List[str], numeric_cols: pd.Index, metrics: List[str]) -> Optional[pd.DataFrame]:
+    """groupby(keys).agg(metrics) through _groupby_kernel, shaped like the pandas result.
+    Returns None when a metric isn't covered or the frame is too small to be worth it.
+    """
+    if len(df) < _NUMBA_MIN_ROWS or not set(metrics) <= _NUMBA_METRICS:
+        return None
+    value_cols = [c for c in numeric_cols if c not in keys]
+    grouped = df.groupby(keys)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    index = grouped.size().index
+    vals = np.asfortranarray(df[value_cols].to_numpy(dtype=np.float64, na_value=np.nan))
+    sums, counts, mins, maxs = _groupby_kernel(codes, vals, len(index))
+
+    empty = counts == 0
+    mins[empty] = np.nan
+    maxs[empty] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    by_metric = {"sum": sums, "count": counts, "min": mins, "max": maxs, "mean": means}
+    columns = {}
+    for j, col in enumerate(value_cols):
+        # Plain numpy int columns can't hold nulls, so every group has a value to cast back.
+        # Nullable Int64/Arrow ints can, and stay float so empty groups keep NaN.
+        dtype = df[col].dtype
+        integral = isinstance(dtype, np.dtype) and dtype.kind in "iu"
+        for metric in metrics:
+            values = by_metric[metric][:, j]
+            if integral and metric in ("sum", "min", "max"):
+                values = values.astype(np.int64)
+            columns[(col, metric)] = values
+    return pd.DataFrame(columns, index=index)
+
+
+# numexpr evaluates numeric filter expressions in blocked, multithreaded C loops
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+
+def _is_arrow_temporal(t) -> bool:
+    return pa.types.is_date(t) or pa.types.is_time(t) or pa.types.is_timestamp(t)
+
+
+# pd.read_csv's default NA markers (Arrow's defaults lack '<NA>' and 'None')
+_CSV_NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+
+def _arrow_convert_options(include: List[str], column_types=None):
+    # Empty and NA cells are null in text columns too, as pandas reads them
+    return pacsv.ConvertOptions(
+        include_columns=include,
+        column_types=column_types,
+        null_values=_CSV_NULL_VALUES,
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=True,
+    )
+
+
+def _arrow_read_csv(file_path: str, usecols: Optional[List[str]] = None):
+    """Arrow table of a CSV whose to_pandas() matches pd.read_csv: same NA cells, and
+    dates, times and timestamps kept as strings. Raises pa.ArrowInvalid on files
+    pyarrow can't parse (ragged rows, odd quoting).
+    """
+    read_options = pacsv.ReadOptions(use_threads=True, block_size=1 << 20)
+    include = list(usecols or [])
+    # Arrow infers dates, times and timestamps that pd.read_csv keeps as strings
+    # (and date/time objects aren't JSON serialisable), so those columns are read as
+    # text; all-empty columns are float, as in pandas, rather than Arrow's null type.
+    # Types are inferred from the first block, so its schema is the table's.
+    with pacsv.open_csv(file_path, read_options=read_options,
+                        convert_options=_arrow_convert_options(include)) as reader:
+        column_types = {}
+        for f in reader.schema:
+            if _is_arrow_temporal(f.type):
+                column_types[f.name] = pa.string()
+            elif pa.types.is_null(f.type):
+                column_types[f.name] = pa.float64()
+    return pacsv.read_csv(
+        file_path,
+        read_options=read_options,
+        convert_options=_arrow_convert_options(include, column_types),
+    )
+
+
+def _read_csv(file_path: str, usecols: Optional[List[str]] = None, nrows: Optional[int] = None) -> pd.DataFrame:
+    """Read a CSV file, preferring pyarrow's parallel parser"""
+    if pacsv is not None and nrows is None:
+        try:
+            return _arrow_read_csv(file_path, usecols).to_pandas()
+        except pa.ArrowInvalid:
+            # Files pyarrow rejects (ragged rows, odd quoting) still go through pandas
+            pass
+    return pd.read_csv(file_path, usecols=usecols, nrows=nrows)
+
+
+def _read_excel(file_path: str, usecols: Optional[List[str]] = None, nrows: Optional[int] = None) -> pd.DataFrame:
+    """Read the first sheet of an Excel file into a DataFrame.
+    Without calamine, .xlsx/.xlsm are streamed with openpyxl in read_only mode
+    instead of building the full workbook DOM.
+    """
+    if _EXCEL_ENGINE is not None or not file_path.lower().endswith(('.xlsx', '.xlsm')):
+        return pd.read_excel(file_path, engine=_EXCEL_ENGINE, usecols=usecols, nrows=nrows)
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        # The first sheet, as pd.read_excel reads, not whichever was active when saved
+        rows = wb.worksheets[0].values
+        headers = next(rows, None)
+        if headers is None:
+            return pd.DataFrame()
+        if nrows is not None:
+            rows = islice(rows, nrows)
+        data = list(rows)
+    finally:
+        wb.close()
+    # read_only sheets report their stored dimension, which can include empty trailing rows
+    while data and all(v is None for v in data[-1]):
+        data.pop()
+    df = pd.DataFrame(data, columns=_excel_headers(headers))
+    return df[usecols] if usecols else df
+
+
+def _excel_headers(headers) -> List[Any]:
+    """Column names as pandas derives them: empty headers become 'Unnamed: i' and
+    repeated names get '.1', '.2', ... suffixes"""
+    names: List[Any] = []
+    seen: Dict[Any, int] = {}
+    for i, name in enumerate(headers):
+        if name is None or name == "":
+            name = f"Unnamed: {i}"
+        if name in seen:
+            base = name
+            while name in seen:
+                seen[base] += 1
+                name = f"{base}.{seen[base]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+_QUARTILES = [0.25, 0.5, 0.75]
+
+def _numeric_columns(df: pd.DataFrame) -> pd.Index:
+    """Columns of any numeric dtype (int32/float32, nullable Int64, Arrow numerics), not bool"""
+    is_num = pd.api.types.is_numeric_dtype
+    is_bool = pd.api.types.is_bool_dtype
+    return df.columns[[is_num(t) and not is_bool(t) for t in df.dtypes]]
+
+
+# Column matrices at least this large have their stats computed on several threads
+_PARALLEL_STATS_MIN_CELLS = 1_000_000
+_STATS_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _matrix_stats(arr: np.ndarray, has_nan: bool, percentiles: bool) -> Dict[str, np.ndarray]:
+    """Column-wise mean/std/min/max (and quartiles) of a float matrix"""
+    if has_nan:
+        stats = {
+            "mean": np.nanmean(arr, axis=0),
+            "std": np.nanstd(arr, axis=0, ddof=1),
+            "min": np.nanmin(arr, axis=0),
+            "max": np.nanmax(arr, axis=0),
+        }
+        if percentiles:
+            stats["quartiles"] = np.nanquantile(arr, _QUARTILES, axis=0)
+    else:
+        # Complete table: skip the NaN masking
+        stats = {
+            "mean": arr.mean(axis=0),
+            "std": arr.std(axis=0, ddof=1),
+            "min": arr.min(axis=0),
+            "max": arr.max(axis=0),
+        }
+        if percentiles:
+            stats["quartiles"] = np.quantile(arr, _QUARTILES, axis=0)
+    return stats
+
+
+# Rows read to infer column types before a projected full read
+_SAMPLE_ROWS = 1000
+
+
+def _numeric_projection(file_path: str, extra: Optional[List[str]] = None) -> Optional[List[str]]:
+    """Columns to read for numeric-only analyses: numeric columns plus `extra`, in file order.
+    Types come from a leading sample; a column that is numeric over the whole file is
+    numeric in any sample of it, so nothing the analyses use is dropped.
+    Returns None (read everything) for formats without column selection, and when the
+    whole file is already in the parse cache.
+    """
+    st = os.stat(file_path)
+    if _cached_frame((file_path, st.st_mtime_ns, st.st_size, None)) is not None:
+        return None
+    sampled = _sample_columns(file_path, st.st_mtime_ns, st.st_size)
+    if sampled is None:
+        return None
+    columns, numeric = sampled
+    keep = numeric | set(extra or [])
+    return [c for c in columns if c in keep]
+
+
+@lru_cache(maxsize=128)
+def _sample_columns(file_path: str, mtime_ns: int, size: int) -> Optional[tuple]:
+    """(columns in file order, frozenset of numeric columns) per file version, or None
+    when the format can't read a column subset any cheaper than the whole file"""
+    ext = Path(file_path).suffix.lower()
+    try:
+        if ext == '.csv':
+            sample = _read_csv(file_path, nrows=_SAMPLE_ROWS)
+        elif ext in _EXCEL_EXTENSIONS:
+            if _EXCEL_ENGINE is None and ext == '.xlsx':
+                # The openpyxl reader parses every column anyway; a sample read would only add work
+                return None
+            sample = _read_excel(file_path, nrows=_SAMPLE_ROWS)
+        elif ext == '.parquet' and pq is not None:
+            # Parquet carries its schema, so no sample rows are needed
+            schema = pq.read_schema(file_path)
+            return (tuple(schema.names), frozenset(
+                f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)))
+        else:
+            return None
+    except Exception:
+        return None
+    return tuple(sample.columns), frozenset(_numeric_columns(sample))
+
+
+# Parsed DataFrames per (path, mtime_ns, size, usecols); mtime/size in the key invalidate
+# stale entries. Least recently used entries are dropped beyond _FRAME_CACHE_SIZE.
+_FRAME_CACHE_SIZE = 32
+_frame_cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_frame_cache_lock = threading.Lock()
+
+
+def _cached_frame(key: tuple) -> Optional[pd.DataFrame]:
+    with _frame_cache_lock:
+        df = _frame_cache.get(key)
+        if df is not None:
+            _frame_cache.move_to_end(key)
+        return df
+
+
+def _read_file_cached(file_path: str, mtime_ns: int, size: int, usecols: Optional[tuple] = None) -> pd.DataFrame:
+    """Parsed DataFrame per file version, read on a cache miss.
+    Callers must treat the result as read-only since it is shared.
+    """
+    key = (file_path, mtime_ns, size, usecols)
+    df = _cached_frame(key)
+    if df is None:
+        df = DataAnalysisTool._read_file(file_path, list(usecols) if usecols else None)
+        with _frame_cache_lock:
+            _frame_cache[key] = df
+            while len(_frame_cache) > _FRAME_CACHE_SIZE:
+                _frame_cache.popitem(last=False)
+    return df
+
+
+# One lock per cache key so concurrent tool calls on the same file parse it once,
+# while different files still parse in parallel
+_parse_locks: Dict[tuple, threading.Lock] = {}
+_parse_locks_guard = threading.Lock()
+
+
+def _load_dataframe(file_path: str, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read file (optionally only `usecols`) through the parse cache"""
+    st = os.stat(file_path)
+    key = (file_path, st.st_mtime_ns, st.st_size, tuple(usecols) if usecols else None)
+    with _parse_locks_guard:
+        if len(_parse_locks) > 128:
+            # Forget locks nobody is holding; stale file versions accumulate otherwise
+            for k in [k for k, l in _parse_locks.items() if not l.locked()]:
+                del _parse_locks[k]
+        lock = _parse_locks.setdefault(key, threading.Lock())
+    with lock:
+        return _read_file_cached(*key)
+
+
+@lru_cache(maxsize=128)
+def _query_names(query: str) -> Optional[tuple]:
+    """Names referenced by a query expression, parsed once per distinct query"""
+    try:
+        return compile(query, "<query>", "eval").co_names
+    except SyntaxError:
+        return None
+
+
+def _query_mask(df: pd.DataFrame, query: str) -> np.ndarray:
+    """Boolean row mask for a pandas query string, without copying any matching rows.
+    Evaluated directly with numexpr when the expression only touches plain numeric
+    columns; anything else goes through df.eval.
+    """
+    if ne is not None:
+        names = _query_names(query)
+        if names and all(n in df.columns and df[n].dtype.kind in "biuf" for n in names):
+            try:
+                mask = ne.evaluate(query, local_dict={n: df[n].to_numpy() for n in names})
+            except Exception:
+                mask = None  # e.g. `and`/`or`, which numexpr spells `&`/`|`
+            if mask is not None and mask.dtype == bool and mask.shape == (len(df),):
+                return mask
+    mask = np.asarray(df.eval(query))
+    if mask.dtype != bool or mask.shape != (len(df),):
+        raise ValueError(f"Query must evaluate to a boolean row mask: {query}")
+    return mask
+
+
+def _polars_aggregate(file_path: str, keys: List[str], metrics: List[str]) -> Optional[tuple]:
+    """groupby(keys).agg(metrics) over the numeric columns with Polars' lazy engine.
+    Returns (result_df, numeric_cols) shaped like the pandas path, or None when the
+    file type or a metric isn't supported so the caller falls back to pandas.
+    """
+    ext = Path(file_path).suffix.lower()
+    if ext not in ('.csv', '.parquet') or not set(metrics) <= set(_POLARS_METRICS):
+        return None
+    lf = pl.scan_csv(file_path) if ext == '.csv' else pl.scan_parquet(file_path)
+    schema = lf.collect_schema()
+    numeric_cols = [c for c, dtype in schema.items() if dtype.is_numeric() and c not in keys]
+    aggs = [
+        getattr(pl.col(col), _POLARS_METRICS[metric])().alias(f"{col}\x00{metric}")
+        for col in numeric_cols for metric in metrics
+    ]
+    # Like pandas groupby: rows with a null key are dropped and groups come out sorted
+    out = lf.drop_nulls(keys).group_by(keys).agg(aggs).sort(keys).collect()
+
+    result_df = pd.DataFrame(out.to_dict(as_series=False)).set_index(keys)
+    if aggs:
+        result_df.columns = pd.MultiIndex.from_tuples([tuple(c.split("\x00")) for c in result_df.columns])
+    return result_df, pd.Index(numeric_cols)
+
+
+# CSVs above this size are aggregated chunk by chunk instead of loaded whole
+_STREAM_AGG_BYTES = 128 * 1024 * 1024
+_STREAM_CHUNK_ROWS = 200_000
+# Metrics that can be rebuilt from per-chunk partials, and how partials are combined
+_PARTIAL_REDUCERS = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+_STREAMABLE_METRICS = set(_PARTIAL_REDUCERS) | {"mean"}
+
+
+# CSVs above this size are profiled chunk by chunk for the summary/missing analyses
+_STREAM_SUMMARY_BYTES = 256 * 1024 * 1024
+
+
+def _merge_chunk_dtypes(a, b):
+    """dtype pandas infers for a column over two chunks read as a and b: numeric chunks
+    widen (int + float -> float), anything else mixed becomes object"""
+    if a == b:
+        return a
+    is_num = pd.api.types.is_numeric_dtype
+    is_bool = pd.api.types.is_bool_dtype
+    if is_num(a) and is_num(b) and not is_bool(a) and not is_bool(b):
+        return np.result_type(a, b)
+    return np.dtype(object)
+
+
+def _streaming_profile(file_path: str) -> Optional[Dict[str, Any]]:
+    """One chunked pass over a CSV collecting what the summary and missing analyses need:
+    shape, dtypes, a sample, per-column null counts and count/mean/std/min/max of the
+    numeric columns. Per-chunk mean/variance partials are merged with Chan's update, so
+    the moments are exact; quartiles are not mergeable and are left out.
+    dtypes are merged across chunks as a whole-file read infers them, and a column that
+    turns non-numeric in a later chunk is dropped from the numeric summary, as the
+    in-memory path would. Returns None for a file with no rows.
+    """
+    rows = 0
+    first = None
+    for chunk in pd.read_csv(file_path, chunksize=_STREAM_CHUNK_ROWS):
+        if first is None:
+            first = chunk
+            dtypes = chunk.dtypes.to_dict()
+            numeric = list(_numeric_columns(chunk))
+            demoted = np.zeros(len(numeric), dtype=bool)
+            count = np.zeros(len(numeric))
+            mean = np.zeros(len(numeric))
+            m2 = np.zeros(len(numeric))
+            lo = np.full(len(numeric), np.inf)
+            hi = np.full(len(numeric), -np.inf)
+            nulls = chunk.isnull().sum()
+        else:
+            dtypes = {c: _merge_chunk_dtypes(t, chunk[c].dtype) for c, t in dtypes.items()}
+            nulls = nulls.add(chunk.isnull().sum(), fill_value=0)
+        rows += len(chunk)
+
+        textual = _non_numeric(chunk, numeric)
+        demoted |= [c in textual for c in numeric]
+        live = [c for c, gone in zip(numeric, demoted) if not gone]
+        arr = np.full((len(chunk), len(numeric)), np.nan)
+        arr[:, ~demoted] = chunk[live].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(arr)
+        n_b = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(valid, arr, 0.0).sum(axis=0) / n_b
+            m2_b = np.where(valid, arr - mean_b, 0.0) ** 2
+            total = count + n_b
+            delta = mean_b - mean
+            has_b = n_b > 0
+            mean = np.where(has_b, mean + delta * n_b / np.maximum(total, 1), mean)
+            m2 = np.where(has_b, m2 + m2_b.sum(axis=0) + delta ** 2 * count * n_b / np.maximum(total, 1), m2)
+        count = total
+        lo = np.fmin(lo, np.where(valid, arr, np.inf).min(axis=0))
+        hi = np.fmax(hi, np.where(valid, arr, -np.inf).max(axis=0))
+
+    if first is None or rows == 0:
+        return None
+    # Columns that turned textual are strings in a whole-file read, in the sample too
+    sample = first.head(5).copy()
+    for col, gone in zip(numeric, demoted):
+        if gone:
+            sample[col] = sample[col].map(lambda v: v if pd.isna(v) else str(v)).astype(object)
+    seen = count > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+    stats = {
+        col: {
+            "count": float(count[i]),
+            "mean": float(mean[i]) if seen[i] else np.nan,
+            "std": float(std[i]),
+            "min": float(lo[i]) if seen[i] else np.nan,
+            "max": float(hi[i]) if seen[i] else np.nan,
+        } for i, col in enumerate(numeric) if not demoted[i]
+    }
+    return {
+        "rows": rows,
+        "columns": first.columns.tolist(),
+        "dtypes": {c: str(t) for c, t in dtypes.items()},
+        "sample": sample,
+        "null_counts": nulls.astype(np.int64),
+        "numeric_summary": stats,
+    }
+
+
+def _non_numeric(chunk: pd.DataFrame, cols: List[str]) -> set:
+    """Columns of `cols` that pandas did not parse as numeric in this chunk"""
+    numeric = set(_numeric_columns(chunk[cols]))
+    return {c for c in cols if c not in numeric}
+
+
+def _restore_key_dtype(values: pd.Index, has_nulls: bool) -> pd.Index:
+    """Group keys read as text, converted back to numbers when every value parses as one,
+    as a whole-file read infers them; a key column with empty cells reads as float"""
+    try:
+        restored = pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return values
+    return (restored.astype(np.float64) if has_nulls else restored).rename(values.name)
+
+
+def _stream_aggregate(file_path: str, keys: List[str], value_cols: List[str], metrics: List[str]) -> tuple:
+    """groupby(keys).agg over a CSV read in chunks, so memory stays bounded by the chunk size.
+    Each chunk is reduced to partial sums/counts/mins/maxes per group, and the partials are
+    reduced again at the end; mean is rebuilt from the carried sum and count.
+    Keys are read as text in every chunk so one value can't land in an int group in one
+    chunk and a str group in another. Returns (result, value columns aggregated): a column
+    that turns out non-numeric in any chunk is dropped, as the in-memory path would.
+    """
+    partial_metrics = {"sum", "count"} if "mean" in metrics else set()
+    partial_metrics |= set(metrics) - {"mean"}
+    partial_metrics = sorted(partial_metrics)
+
+    partials = []
+    dropped: set = set()
+    null_keys: set = set()
+    for chunk in pd.read_csv(file_path, chunksize=_STREAM_CHUNK_ROWS, usecols=keys + value_cols,
+                             dtype={k: str for k in keys}):
+        dropped |= _non_numeric(chunk, value_cols)
+        null_keys.update(k for k in keys if chunk[k].isna().any())
+        live = [c for c in value_cols if c not in dropped]
+        if live:
+            partials.append(chunk.groupby(keys)[live].agg(partial_metrics))
+    value_cols = [c for c in value_cols if c not in dropped]
+    if not value_cols or not partials:
+        return pd.DataFrame(), pd.Index(value_cols)
+
+    combined = pd.concat(partials)
+    levels = list(range(len(keys)))
+    arrays = [_restore_key_dtype(combined.index.get_level_values(i), keys[i] in null_keys) for i in levels]
+    combined.index = pd.MultiIndex.from_arrays(arrays, names=keys) if len(keys) > 1 else arrays[0]
+    reduced = {
+        m: combined.xs(m, axis=1, level=1)[value_cols].groupby(level=levels).agg(_PARTIAL_REDUCERS[m])
+        for m in partial_metrics
+    }
+    columns = {}
+    for col in value_cols:
+        for metric in metrics:
+            if metric == "mean":
+                columns[(col, metric)] = reduced["sum"][col] / reduced["count"][col].where(reduced["count"][col] > 0)
+            else:
+                columns[(col, metric)] = reduced[metric][col]
+    return pd.DataFrame(columns), pd.Index(value_cols)
 
-from langchain_anthropic import ChatAnthropic
-from langchain_core.prompts import PromptTemplate
 
 class DataAnalysisTool:
     """Handles data analysis for various file formats"""
     
     @staticmethod
-    def _read_file(file_path: str) -> pd.DataFrame:
-        """Read file into pandas DataFrame based on extension"""
+    def _read_file(file_path: str, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read file into pandas DataFrame based on extension.
+        usecols limits parsing to the given columns where the reader supports it.
+        """
         path = Path(file_path)
         ext = path.suffix.lower()
         
         if ext == '.csv':
-            return pd.read_csv(file_path)
-        elif ext in ['.xls', '.xlsx']:
-            return pd.read_excel(file_path)
+            return _read_csv(file_path, usecols)
+        elif ext in _EXCEL_EXTENSIONS:
+            return _read_excel(file_path, usecols)
         elif ext == '.json':
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            data = _load_json(file_path)
             # Convert JSON to DataFrame
             if isinstance(data, list):
-                return pd.DataFrame(data)
+                df = pd.DataFrame(data)
+            elif isinstance(data, dict) and data and all(isinstance(v, list) for v in data.values()) \
+                    and len({len(v) for v in data.values()}) == 1:
+                # Column-oriented {"col": [values, ...]} layout
+                df = pd.DataFrame(data)
             elif isinstance(data, dict):
                 # Handle nested dictionary
-                return pd.DataFrame([data])
+                df = pd.DataFrame([data])
             else:
                 raise ValueError(f"Unsupported JSON structure in {file_path}")
+            return df[usecols] if usecols else df
+        elif ext == '.parquet':
+            # Columnar format: only the requested columns are read from disk
+            return pd.read_parquet(file_path, columns=usecols)
         else:
             raise ValueError(f"Unsupported file format: {ext}")
 
+    @staticmethod
+    def _column_stats(numeric_df: pd.DataFrame, percentiles: bool = True) -> Dict[str, np.ndarray]:
+        """Per-column count/mean/std/min/max (and quartiles) of a numeric frame, each one
+        vectorised reduction over the column matrix. std uses ddof=1 and quartiles use
+        linear interpolation, matching pandas. Large matrices are reduced in column
+        blocks on a thread pool, since NumPy's reductions release the GIL.
+        """
+        arr = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+        nan_mask = np.isnan(arr)
+        stats = {"count": (~nan_mask).sum(axis=0)}
+        has_nan = nan_mask.any()
+        if arr.shape[0] == 0:
+            # Empty frame: every statistic is NaN, as in pandas
+            arr = np.full((1, arr.shape[1]), np.nan)
+            has_nan = True
+        workers = min(_STATS_WORKERS, arr.shape[1])
+        # The filter is process-wide, so it is set once here rather than in each worker
+        with warnings.catch_warnings():
+            # all-NaN or single-row columns legitimately come out as NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if arr.size < _PARALLEL_STATS_MIN_CELLS or workers < 2:
+                stats.update(_matrix_stats(arr, has_nan, percentiles))
+            else:
+                blocks = [slice(b[0], b[-1] + 1) for b in np.array_split(np.arange(arr.shape[1]), workers)]
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    parts = list(pool.map(lambda cols: _matrix_stats(arr[:, cols], has_nan, percentiles), blocks))
+                for key in parts[0]:
+                    stats[key] = np.concatenate([part[key] for part in parts], axis=-1)
+        return stats
+
+    @staticmethod
+    def _numeric_summary(df: pd.DataFrame, percentiles: bool = True) -> Dict[str, Any]:
+        """describe()-shaped summary of numeric columns from _column_stats.
+        The quantile sort only runs when percentiles are requested.
+        """
+        numeric_df = df[_numeric_columns(df)]
+        stats = DataAnalysisTool._column_stats(numeric_df, percentiles)
+        summary = {}
+        for i, col in enumerate(numeric_df.columns):
+            entry = {
+                "count": float(stats["count"][i]),
+                "mean": float(stats["mean"][i]),
+                "std": float(stats["std"][i]),
+                "min": float(stats["min"][i]),
+            }
+            if percentiles:
+                entry.update(zip(("25%", "50%", "75%"), stats["quartiles"][:, i].tolist()))
+            entry["max"] = float(stats["max"][i])
+            summary[col] = entry
+        return summary
+
+    @staticmethod
+    def _correlation(numeric_df: pd.DataFrame, precision: Optional[str] = None) -> pd.DataFrame:
+        """Pearson correlation matrix of numeric columns.
+        Complete tables go through a single np.corrcoef call; precision is "fp32" or
+        "fp64", defaulting to fp32 for tables wider than 50 columns or stored as float32.
+        Tables with NaNs keep pandas' pairwise-complete semantics.
+        """
+        cols = numeric_df.columns
+        if precision is None:
+            all_fp32 = len(cols) > 0 and all(t == np.float32 for t in numeric_df.dtypes)
+            precision = "fp32" if len(cols) > 50 or all_fp32 else "fp64"
+        dtype = np.float32 if precision == "fp32" else np.float64
+        arr = numeric_df.to_numpy(dtype=dtype, na_value=np.nan)
+        if arr.shape[0] < 2 or np.isnan(arr).any():
+            return numeric_df.corr()
+        # Constant columns correlate as NaN (as in pandas); leave them out of the
+        # BLAS product rather than dividing by a zero variance
+        varying = np.flatnonzero(np.ptp(arr, axis=0) > 0)
+        corr = np.full((len(cols), len(cols)), np.nan)
+        if len(varying):
+            sub = np.corrcoef(arr[:, varying], rowvar=False, dtype=dtype)
+            corr[np.ix_(varying, varying)] = np.atleast_2d(sub)
+        return pd.DataFrame(corr, index=cols, columns=cols)
+
     @tool
     def analyze_data(file_path: str, analysis_type: str = "summary") -> Dict[str, Any]:
         """
-        Analyze data from various file formats (CSV, Excel, JSON)
+        Analyze data from various file formats (CSV, Excel, JSON, Parquet)
         
         Args:
             file_path: Path to the data file
@@ -64,44 +750,70 @@ class DataAnalysisTool:
             Dict containing analysis results
         """
         try:
-            df = DataAnalysisTool._read_file(file_path)
+            if (analysis_type in ("summary", "missing") and file_path.lower().endswith('.csv')
+                    and os.path.getsize(file_path) > _STREAM_SUMMARY_BYTES):
+                # Large CSV: reduce chunk by chunk instead of materialising the file
+                profile = _streaming_profile(file_path)
+                if profile is not None and analysis_type == "summary":
+                    return {
+                        "shape": {"rows": profile["rows"], "columns": len(profile["columns"])},
+                        "columns": profile["columns"],
+                        "dtypes": profile["dtypes"],
+                        "numeric_summary": profile["numeric_summary"],
+                        "sample_data": profile["sample"].to_dict(orient='records'),
+                        "streamed": True  # quartiles are omitted for streamed files
+                    }
+                if profile is not None:
+                    counts = profile["null_counts"]
+                    return {
+                        "missing_counts": counts.to_dict(),
+                        "missing_percentages": counts.mul(100.0 / profile["rows"]).to_dict()
+                    }
+
+            # Numeric-only analyses parse just the numeric columns
+            usecols = _numeric_projection(file_path) if analysis_type in ("correlation", "distribution") else None
+            df = _load_dataframe(file_path, usecols)
             
             if analysis_type == "summary":
                 return {
                     "shape": {"rows": df.shape[0], "columns": df.shape[1]},
                     "columns": df.columns.tolist(),
                     "dtypes": df.dtypes.astype(str).to_dict(),
-                    "numeric_summary": df.describe().to_dict(),
+                    "numeric_summary": DataAnalysisTool._numeric_summary(df),
                     "sample_data": df.head(5).to_dict(orient='records')
                 }
             
             elif analysis_type == "correlation":
                 # Only include numeric columns
-                numeric_df = df.select_dtypes(include=['int64', 'float64'])
+                numeric_df = df[_numeric_columns(df)]
                 return {
-                    "correlation_matrix": numeric_df.corr().to_dict(),
+                    "correlation_matrix": DataAnalysisTool._correlation(numeric_df).to_dict(),
                     "numeric_columns": numeric_df.columns.tolist()
                 }
             
             elif analysis_type == "missing":
-                missing_info = df.isnull().sum()
+                # One null-count pass; percentages are a single scalar multiply of it
+                counts = df.isnull().sum()
+                scale = 100.0 / len(df) if len(df) else np.nan
                 return {
-                    "missing_counts": missing_info.to_dict(),
-                    "missing_percentages": (missing_info / len(df) * 100).to_dict()
+                    "missing_counts": counts.to_dict(),
+                    "missing_percentages": counts.mul(scale).to_dict()
                 }
             
             elif analysis_type == "distribution":
-                numeric_df = df.select_dtypes(include=['int64', 'float64'])
+                numeric_df = df[_numeric_columns(df)]
+                stats = DataAnalysisTool._column_stats(numeric_df)
+                quartiles = stats["quartiles"]
                 return {
                     "numeric_columns": {
                         col: {
-                            "mean": df[col].mean(),
-                            "median": df[col].median(),
-                            "std": df[col].std(),
-                            "min": df[col].min(),
-                            "max": df[col].max(),
-                            "quartiles": df[col].quantile([0.25, 0.5, 0.75]).to_dict()
-                        } for col in numeric_df.columns
+                            "mean": float(stats["mean"][i]),
+                            "median": float(quartiles[1, i]),
+                            "std": float(stats["std"][i]),
+                            "min": float(stats["min"][i]),
+                            "max": float(stats["max"][i]),
+                            "quartiles": dict(zip(_QUARTILES, quartiles[:, i].tolist()))
+                        } for i, col in enumerate(numeric_df.columns)
                     }
                 }
             
@@ -124,13 +836,14 @@ class DataAnalysisTool:
             Dict containing query results
         """
         try:
-            df = DataAnalysisTool._read_file(file_path)
-            result_df = df.query(query)
+            df = _load_dataframe(file_path)
+            # Only the returned rows are materialised; matches are counted from the mask
+            matches = np.flatnonzero(_query_mask(df, query))
             
             return {
-                "matched_rows": len(result_df),
+                "matched_rows": len(matches),
                 "total_rows": len(df),
-                "results": result_df.head(100).to_dict(orient='records')  # Limit to 100 rows
+                "results": df.iloc[matches[:100]].to_dict(orient='records')  # Limit to 100 rows
             }
             
         except Exception as e:
@@ -150,11 +863,27 @@ class DataAnalysisTool:
             Dict containing aggregation results
         """
         try:
-            df = DataAnalysisTool._read_file(file_path)
-            numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-            
-            agg_dict = {col: metrics for col in numeric_cols}
-            result_df = df.groupby(group_by).agg(agg_dict)
+            # Only the group keys and numeric columns take part in the aggregation
+            keys = [group_by] if isinstance(group_by, str) else list(group_by)
+            polars_result = _polars_aggregate(file_path, keys, metrics) if _use_polars() else None
+            usecols = _numeric_projection(file_path, extra=keys) if polars_result is None else None
+
+            if polars_result is not None:
+                result_df, numeric_cols = polars_result
+            elif (usecols and file_path.lower().endswith('.csv')
+                    and set(metrics) <= _STREAMABLE_METRICS
+                    and os.path.getsize(file_path) > _STREAM_AGG_BYTES):
+                # Large CSV: aggregate chunk by chunk rather than materialising the file
+                value_cols = [c for c in usecols if c not in keys]
+                result_df, numeric_cols = _stream_aggregate(file_path, keys, value_cols, metrics)
+            else:
+                df = _load_dataframe(file_path, usecols)
+                numeric_cols = _numeric_columns(df)
+
+                result_df = _numba_aggregate(df, keys, numeric_cols, metrics) if _use_numba() else None
+                if result_df is None:
+                    agg_dict = {col: metrics for col in numeric_cols}
+                    result_df = df.groupby(group_by).agg(agg_dict)
             
             return {
                 "group_by_columns": group_by,
@@ -166,6 +895,23 @@ class DataAnalysisTool:
         except Exception as e:
             return {"error": str(e)}
 
+# Resolved once at import, like the agents' AI_MODEL setting
+_VIS_MODEL = os.getenv("AI_MODEL", "claude-3-5-sonnet-20240620")
+
+
+@lru_cache(maxsize=4)
+def _vis_llm(model: str):
+    """Chat client per model, built once so its HTTP connection pool is reused across calls"""
+    from langchain_anthropic import ChatAnthropic
+    return ChatAnthropic(model=model, anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+# Visualization strategies per (model, columns, preview) -> (timestamp, strategy).
+# Like _vis_llm, this lives in each visualization worker process, not in the API process
+_VIS_CACHE: Dict[str, tuple] = {}
+_VIS_CACHE_TTL = 3600.0
+_VIS_CACHE_MAX = 256
+
+
 def intelligent_data_visualization(file_path: str) -> Optional[Dict[str, Any]]:
     """
     Intelligently generate data visualization based on file content
@@ -177,72 +923,92 @@ def intelligent_data_visualization(file_path: str) -> Optional[Dict[str, Any]]:
         Dict with visualization details or None if generation fails
     """
     try:
-        # Read file based on extension
-        if file_path.endswith('.xlsx'):
-            df = pd.read_excel(file_path)
-        elif file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
+        # Read file based on extension. This runs in main.py's worker processes, where the
+        # parse cache would pin up to _FRAME_CACHE_SIZE frames per worker, so read directly
+        if file_path.lower().endswith(_EXCEL_EXTENSIONS) or file_path.endswith('.csv'):
+            df = DataAnalysisTool._read_file(file_path)
         else:
             raise ValueError("Unsupported file type")
         
-        # Initialize LLM for intelligent visualization
-        llm = ChatAnthropic(model="claude-3-5-sonnet-20240620")
-        
-        # Prompt for visualization strategy
-        visualization_prompt = PromptTemplate.from_template("""
-        Analyze the following data and suggest the most informative visualization:
-
-        Data preview:
-        {data_preview}
-
-        Columns: {columns}
-
-        Suggest:
-        1. Visualization type (pie, bar, line, scatter)
-        2. Columns to use
-        3. Key insights to highlight
-
-        Provide a concise recommendation.
-        """)
-        
         # Prepare data for prompt
         data_preview = df.head().to_string()
         columns = list(df.columns)
         
-        # Get visualization recommendation
-        visualization_strategy = llm.invoke(
-            visualization_prompt.format(
-                data_preview=data_preview, 
-                columns=columns
-            )
-        ).content
-        
-        # Generate visualization based on strategy
-        plt.figure(figsize=(10, 6))
-        
-        # Basic visualization logic (can be expanded)
-        if 'pie' in visualization_strategy.lower():
-            # Assume first column is labels, second is values
-            plt.pie(df.iloc[:, 1], labels=df.iloc[:, 0], autopct='%1.1f%%')
-            plt.title(f'Pie Chart: {df.columns[0]} vs {df.columns[1]}')
-        elif 'bar' in visualization_strategy.lower():
-            df.plot(kind='bar', x=df.columns[0], y=df.columns[1])
-            plt.title(f'Bar Chart: {df.columns[0]} vs {df.columns[1]}')
-        elif 'line' in visualization_strategy.lower():
-            df.plot(kind='line')
-            plt.title('Line Chart of Data')
+        # Same model, columns and preview give the same recommendation, so reuse it
+        cache_key = hashlib.sha256(
+            "|".join([_VIS_MODEL, *map(str, columns), data_preview]).encode()
+        ).hexdigest()
+        cached = _VIS_CACHE.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < _VIS_CACHE_TTL:
+            visualization_strategy = cached[1]
         else:
-            df.plot(kind='scatter', x=df.columns[0], y=df.columns[1])
-            plt.title(f'Scatter Plot: {df.columns[0]} vs {df.columns[1]}')
+            from langchain_core.prompts import PromptTemplate
+
+            # LLM for intelligent visualization
+            llm = _vis_llm(_VIS_MODEL)
+            
+            # Prompt for visualization strategy
+            visualization_prompt = PromptTemplate.from_template("""
+            Analyze the following data and suggest the most informative visualization:
+
+            Data preview:
+            {data_preview}
+
+            Columns: {columns}
+
+            Suggest:
+            1. Visualization type (pie, bar, line, scatter)
+            2. Columns to use
+            3. Key insights to highlight
+
+            Provide a concise recommendation.
+            """)
+            
+            # Get visualization recommendation
+            visualization_strategy = llm.invoke(
+                visualization_prompt.format(
+                    data_preview=data_preview, 
+                    columns=columns
+                )
+            ).content
+            if len(_VIS_CACHE) >= _VIS_CACHE_MAX:
+                _VIS_CACHE.pop(next(iter(_VIS_CACHE)))
+            _VIS_CACHE[cache_key] = (time.monotonic(), visualization_strategy)
         
-        # Save visualization
-        output_dir = os.path.dirname(file_path)
-        output_filename = f"{os.path.splitext(os.path.basename(file_path))[0]}_visualization.png"
-        output_path = os.path.join(output_dir, output_filename)
+        import matplotlib
+        matplotlib.use("Agg")  # headless: no GUI toolkit needed to render a PNG
+        import matplotlib.pyplot as plt
+
+        # Generate visualization based on strategy on an explicit figure/axes
+        # rather than pyplot's global current figure
+        fig, ax = plt.subplots(figsize=(10, 6))
+        strategy = visualization_strategy.lower()
         
-        plt.tight_layout()
-        plt.savefig(output_path)
-        plt.close()
+        try:
+            # Basic visualization logic (can be expanded)
+            if 'pie' in strategy:
+                # Assume first column is labels, second is values
+                ax.pie(df.iloc[:, 1], labels=df.iloc[:, 0], autopct='%1.1f%%')
+                ax.set_title(f'Pie Chart: {df.columns[0]} vs {df.columns[1]}')
+            elif 'bar' in strategy:
+                df.plot(kind='bar', x=df.columns[0], y=df.columns[1], ax=ax)
+                ax.set_title(f'Bar Chart: {df.columns[0]} vs {df.columns[1]}')
+            elif 'line' in strategy:
+                df.plot(kind='line', ax=ax)
+                ax.set_title('Line Chart of Data')
+            else:
+                df.plot(kind='scatter', x=df.columns[0], y=df.columns[1], ax=ax)
+                ax.set_title(f'Scatter Plot: {df.columns[0]} vs {df.columns[1]}')
+            
+            # Save visualization
+            output_dir = os.path.dirname(file_path)
+            output_filename = f"{os.path.splitext(os.path.basename(file_path))[0]}_visualization.png"
+            output_path = os.path.join(output_dir, output_filename)
+            
+            fig.tight_layout()
+            fig.savefig(output_path, dpi=100)
+        finally:
+            plt.close(fig)
         
         return {
             "chart_path": output_path,
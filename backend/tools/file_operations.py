@@ -5,12 +5,37 @@ import os
 import time
 import asyncio
 import aiofiles
-from typing import List, Dict, Any, Optional
-from langchain_core.tools import tool
+from typing import List, Dict, Any, Optional, Tuple
+from langchain_core.tools import StructuredTool
+from pydantic import Field, create_model
 
+# Project root (parent of backend), resolved once at import
+_PROJECT_ROOT = os.path.realpath(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT_PREFIX = os.path.join(_PROJECT_ROOT, "")
 
-@tool
-def read_file_content(file_path: str) -> str:
+
+def _safe_join(rel_path: str) -> Optional[str]:
+    """Resolve a project-relative path; None if it escapes the project (via .. or symlinks)"""
+    full_path = os.path.realpath(os.path.join(_PROJECT_ROOT, rel_path))
+    if full_path == _PROJECT_ROOT or full_path.startswith(_ROOT_PREFIX):
+        return full_path
+    return None
+
+
+def _check_file_path(file_path: str) -> Tuple[Optional[str], Optional[str]]:
+    """(full_path, None) for a safe project-relative file path, else (None, error message)"""
+    # Ensure path is relative and safe
+    if os.path.isabs(file_path):
+        return None, "Error: Absolute paths not allowed. Use relative path from project directory."
+    
+    # Security check - ensure file is within project
+    full_path = _safe_join(file_path)
+    if full_path is None:
+        return None, "Error: File path outside project directory not allowed."
+    return full_path, None
+
+
+def _read_file_content(file_path: str) -> str:
     """
     Read the content of a text file.
     
@@ -21,18 +46,9 @@ def read_file_content(file_path: str) -> str:
         The content of the file as a string
     """
     try:
-        # Ensure path is relative and safe
-        if os.path.isabs(file_path):
-            return f"Error: Absolute paths not allowed. Use relative path from project directory."
-        
-        # Get the project root (parent of backend)
-        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        project_root = os.path.dirname(backend_dir)
-        full_path = os.path.join(project_root, file_path)
-        
-        # Security check - ensure file is within project
-        if not os.path.commonpath([project_root, full_path]) == project_root:
-            return f"Error: File path outside project directory not allowed."
+        full_path, error = _check_file_path(file_path)
+        if error:
+            return error
         
         if not os.path.exists(full_path):
             return f"Error: File '{file_path}' does not exist."
@@ -50,8 +66,29 @@ def read_file_content(file_path: str) -> str:
         return f"Error reading file '{file_path}': {str(e)}"
 
 
-@tool
-def write_file_content(file_path: str, content: str) -> str:
+async def _aread_file_content(file_path: str) -> str:
+    """Async counterpart of _read_file_content; the read doesn't block the event loop"""
+    try:
+        full_path, error = _check_file_path(file_path)
+        if error:
+            return error
+        
+        if not os.path.exists(full_path):
+            return f"Error: File '{file_path}' does not exist."
+        
+        if not os.path.isfile(full_path):
+            return f"Error: '{file_path}' is not a file."
+        
+        async with aiofiles.open(full_path, 'r', encoding='utf-8') as f:
+            content = await f.read()
+        
+        return f"Content of '{file_path}':\n\n{content}"
+        
+    except Exception as e:
+        return f"Error reading file '{file_path}': {str(e)}"
+
+
+def _write_file_content(file_path: str, content: str) -> str:
     """
     Write content to a text file, creating directories if needed.
     
@@ -63,18 +100,9 @@ def write_file_content(file_path: str, content: str) -> str:
         Success or error message
     """
     try:
-        # Ensure path is relative and safe
-        if os.path.isabs(file_path):
-            return f"Error: Absolute paths not allowed. Use relative path from project directory."
-        
-        # Get the project root (parent of backend)
-        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        project_root = os.path.dirname(backend_dir)
-        full_path = os.path.join(project_root, file_path)
-        
-        # Security check - ensure file is within project
-        if not os.path.commonpath([project_root, full_path]) == project_root:
-            return f"Error: File path outside project directory not allowed."
+        full_path, error = _check_file_path(file_path)
+        if error:
+            return error
         
         # Create directories if they don't exist
         dir_path = os.path.dirname(full_path)
@@ -91,8 +119,36 @@ def write_file_content(file_path: str, content: str) -> str:
         return f"Error writing file '{file_path}': {str(e)}"
 
 
-@tool
-def list_files_in_directory(directory_path: str = "") -> str:
+async def _awrite_file_content(file_path: str, content: str) -> str:
+    """Async counterpart of _write_file_content; the write doesn't block the event loop"""
+    try:
+        full_path, error = _check_file_path(file_path)
+        if error:
+            return error
+        
+        dir_path = os.path.dirname(full_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        
+        async with aiofiles.open(full_path, 'w', encoding='utf-8') as f:
+            await f.write(content)
+        
+        return f"Successfully wrote content to '{file_path}'"
+        
+    except Exception as e:
+        return f"Error writing file '{file_path}': {str(e)}"
+
+
+# invoke() runs the sync function, ainvoke() the aiofiles coroutine
+read_file_content = StructuredTool.from_function(
+    func=_read_file_content, coroutine=_aread_file_content, name="read_file_content"
+)
+write_file_content = StructuredTool.from_function(
+    func=_write_file_content, coroutine=_awrite_file_content, name="write_file_content"
+)
+
+
+def _list_files_in_directory(directory_path: str = "") -> str:
     """
     List files and directories in the specified directory.
     
@@ -103,19 +159,12 @@ def list_files_in_directory(directory_path: str = "") -> str:
         List of files and directories
     """
     try:
-        # Get the project root (parent of backend)
-        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        project_root = os.path.dirname(backend_dir)
-        
-        if directory_path:
-            if os.path.isabs(directory_path):
-                return f"Error: Absolute paths not allowed. Use relative path from project directory."
-            full_path = os.path.join(project_root, directory_path)
-        else:
-            full_path = project_root
+        if directory_path and os.path.isabs(directory_path):
+            return f"Error: Absolute paths not allowed. Use relative path from project directory."
         
         # Security check - ensure directory is within project
-        if not os.path.commonpath([project_root, full_path]) == project_root:
+        full_path = _safe_join(directory_path)
+        if full_path is None:
             return f"Error: Directory path outside project directory not allowed."
         
         if not os.path.exists(full_path):
@@ -124,15 +173,16 @@ def list_files_in_directory(directory_path: str = "") -> str:
         if not os.path.isdir(full_path):
             return f"Error: '{directory_path}' is not a directory."
         
-        # List contents
+        # List contents; scandir's entries carry the file type from the directory read,
+        # so only files need a stat (for their size)
         items = []
-        for item in sorted(os.listdir(full_path)):
-            item_path = os.path.join(full_path, item)
-            if os.path.isdir(item_path):
-                items.append(f"[DIR]  {item}/")
+        with os.scandir(full_path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            if entry.is_dir():
+                items.append(f"[DIR]  {entry.name}/")
             else:
-                file_size = os.path.getsize(item_path)
-                items.append(f"[FILE] {item} ({file_size} bytes)")
+                items.append(f"[FILE] {entry.name} ({entry.stat().st_size} bytes)")
         
         if not items:
             return f"Directory '{directory_path or 'project root'}' is empty."
@@ -143,8 +193,7 @@ def list_files_in_directory(directory_path: str = "") -> str:
         return f"Error listing directory '{directory_path}': {str(e)}"
 
 
-@tool
-def get_file_info(file_path: str) -> str:
+def _get_file_info(file_path: str) -> str:
     """
     Get information about a file (size, type, exists, etc.).
     
@@ -154,19 +203,12 @@ def get_file_info(file_path: str) -> str:
     Returns:
         Information about the file
     """
+    if not file_path:
+        return "Error: No file path provided."
     try:
-        # Ensure path is relative and safe
-        if os.path.isabs(file_path):
-            return f"Error: Absolute paths not allowed. Use relative path from project directory."
-        
-        # Get the project root (parent of backend)
-        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        project_root = os.path.dirname(backend_dir)
-        full_path = os.path.join(project_root, file_path)
-        
-        # Security check - ensure file is within project
-        if not os.path.commonpath([project_root, full_path]) == project_root:
-            return f"Error: File path outside project directory not allowed."
+        full_path, error = _check_file_path(file_path)
+        if error:
+            return error
         
         if not os.path.exists(full_path):
             return f"File '{file_path}' does not exist."
@@ -183,4 +225,24 @@ def get_file_info(file_path: str) -> str:
         return "\n".join(info)
         
     except Exception as e:
-        return f"Error getting file info for '{file_path}': {str(e)}"
\ No newline at end of file
+        return f"Error getting file info for '{file_path}': {str(e)}"
+
+
+# Explicit argument schemas, built once at import instead of inferred from the signatures
+_DirectoryArgs = create_model(
+    "ListFilesInDirectoryArgs",
+    directory_path=(str, Field("", description="Path to directory (relative to project directory, empty for root)")),
+)
+_FileInfoArgs = create_model(
+    "GetFileInfoArgs",
+    file_path=(str, Field(..., description="Path to the file (relative to project directory)")),
+)
+
+list_files_in_directory = StructuredTool.from_function(
+    func=_list_files_in_directory, name="list_files_in_directory",
+    args_schema=_DirectoryArgs, infer_schema=False,
+)
+get_file_info = StructuredTool.from_function(
+    func=_get_file_info, name="get_file_info",
+    args_schema=_FileInfoArgs, infer_schema=False,
+)
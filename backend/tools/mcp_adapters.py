@@ -2,12 +2,85 @@ from __future__ import annotations
 
 import os
 import time
+import numpy as np
 from typing import Optional
 from langchain.tools import BaseTool
 from pydantic import ConfigDict
 from typing import Any
 from ..mcp_client import MCPClient
 
+# pyarrow gives CSV row/null counts from one multithreaded parse, without building a DataFrame
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pacsv = None
+
+
+def _csv_profile(file_path: str):
+    """(rows, columns, dtypes, null_counts) of a CSV from a single Arrow parse.
+    The table is read as data_analysis reads it (pandas' NA cells, temporal columns as
+    text), and dtypes are what its to_pandas() conversion yields, so output matches the
+    pandas path; null counts are read from the column metadata. None when pyarrow is
+    unavailable or can't parse the file, so the caller falls back to pandas.
+    """
+    if pacsv is None:
+        return None
+    from .data_analysis import _arrow_read_csv
+    try:
+        table = _arrow_read_csv(file_path)
+    except pa.ArrowInvalid:
+        return None
+    columns = table.column_names
+    dtypes = table.schema.empty_table().to_pandas().dtypes.to_dict()
+    nulls = {name: table.column(name).null_count for name in columns}
+    for field in table.schema:
+        # to_pandas() turns int columns with nulls into float and bool ones into object
+        if nulls[field.name] and pa.types.is_integer(field.type):
+            dtypes[field.name] = np.dtype(np.float64)
+        elif nulls[field.name] and pa.types.is_boolean(field.type):
+            dtypes[field.name] = np.dtype(object)
+    return table.num_rows, columns, dtypes, nulls
+
+
+def _count_csv_rows(file_path: str) -> int:
+    """Approximate data rows in a CSV, counted from line breaks in binary blocks without parsing.
+    LF, CRLF and bare CR all end a line and blank lines are skipped; quoted fields spanning
+    lines are still counted once per line, so callers should present the figure as approximate."""
+    lines = 0
+    tail = b""
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            # CRLF turns into an empty line here, which the blank-line check drops
+            parts = (tail + block).replace(b"\r", b"\n").split(b"\n")
+            tail = parts.pop()  # may continue in the next block
+            lines += sum(1 for line in parts if line.strip())
+    if tail.strip():
+        lines += 1  # final line without a trailing newline
+    return max(lines - 1, 0)  # minus the header
+
+
+def _xlsx_row_count(file_path: str) -> Optional[int]:
+    """Data rows of the first sheet from the worksheet's stored dimension, without reading cells.
+    None when the file doesn't record one."""
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        max_row = wb.worksheets[0].max_row
+    finally:
+        wb.close()
+    return None if max_row is None else max(max_row - 1, 0)
+
+
+# The JSON preview only looks at the head of the file
+_JSON_PREVIEW_BYTES = 4096
+
+
+def _read_head(file_path: str, nbytes: int) -> bytes:
+    """First nbytes of a file; a single bounded read, so pages past the head are never touched"""
+    with open(file_path, 'rb', buffering=0) as f:
+        return f.read(nbytes)
+
 
 class MCPListDirectoryTool(BaseTool):
     name: str = "fs_list_directory"
@@ -22,12 +95,12 @@ class MCPListDirectoryTool(BaseTool):
         resp = self.client.fs_list_directory(path)
         if not resp.ok:
             return f"Error: {resp.error}"
-        items = resp.result["items"]
-        lines = []
-        for it in items:
-            tag = "[DIR]" if it["is_dir"] else "[FILE]"
-            lines.append(f"{tag} {it['name']} ({it['size']} bytes)")
-        return f"Contents of '{resp.result['path']}':\n" + ("\n".join(lines) if lines else "Empty")
+        result = resp.result
+        lines = "\n".join(
+            f"{'[DIR]' if it['is_dir'] else '[FILE]'} {it['name']} ({it['size']} bytes)"
+            for it in result["items"]
+        )
+        return f"Contents of '{result['path']}':\n" + (lines or "Empty")
 
 
 class MCPReadFileTool(BaseTool):
@@ -119,13 +192,12 @@ class MCPDataToolShim(BaseTool):
             resp = self.client.fs_list_directory(path)
             if not resp.ok:
                 return f"Error: {resp.error}"
-            items = resp.result.get("items", [])
-            lines = []
-            for it in items:
-                tag = "[DIR]" if it.get("is_dir") else "[FILE]"
-                size = it.get("size", 0)
-                lines.append(f"{tag} {it.get('name')} ({size} bytes)")
-            return f"Contents of '{resp.result.get('path', path)}':\n" + ("\n".join(lines) if lines else "No items found")
+            result = resp.result
+            lines = "\n".join(
+                f"{'[DIR]' if it.get('is_dir') else '[FILE]'} {it.get('name')} ({it.get('size', 0)} bytes)"
+                for it in result.get("items", [])
+            )
+            return f"Contents of '{result.get('path', path)}':\n" + (lines or "No items found")
         if operation == "write":
             try:
                 write_args = _json.loads(arguments)
@@ -146,15 +218,27 @@ class MCPDataToolShim(BaseTool):
             if not _os.path.exists(file_path):
                 return f"Error: File '{file_path}' not found"
             if file_path.endswith(('.xlsx', '.xls')):
-                df = _pd.read_excel(file_path)
-                return f"Excel file with {len(df)} rows, columns: {list(df.columns)}\n\nFirst 5 rows:\n{df.head().to_string()}"
+                # Parse only the preview rows; .xlsx row counts come from the sheet dimension
+                rows = _xlsx_row_count(file_path) if file_path.endswith('.xlsx') else None
+                if rows is None:
+                    df = _pd.read_excel(file_path)
+                    rows = len(df)
+                else:
+                    df = _pd.read_excel(file_path, nrows=5)
+                return f"Excel file with {rows} rows, columns: {list(df.columns)}\n\nFirst 5 rows:\n{df.head().to_string()}"
             elif file_path.endswith('.csv'):
-                df = _pd.read_csv(file_path)
-                return f"CSV file with {len(df)} rows, columns: {list(df.columns)}\n\nFirst 5 rows:\n{df.head().to_string()}"
+                # Parse only the preview rows; the row count is a byte scan
+                df = _pd.read_csv(file_path, nrows=5)
+                return f"CSV file with ~{_count_csv_rows(file_path)} rows, columns: {list(df.columns)}\n\nFirst 5 rows:\n{df.head().to_string()}"
             elif file_path.endswith('.json'):
-                with open(file_path, 'r') as f:
-                    data = _json.load(f)
-                return f"JSON content:\n{_json.dumps(data, indent=2)[:1000]}"
+                text = _read_head(file_path, _JSON_PREVIEW_BYTES).decode('utf-8', errors='replace')
+                try:
+                    # Small files parse whole and are pretty-printed as before
+                    preview = _json.dumps(_json.loads(text), indent=2)[:1000]
+                except ValueError:
+                    # Cut off mid-document: show the raw head
+                    preview = text[:1000]
+                return f"JSON content:\n{preview}"
             else:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
@@ -174,12 +258,19 @@ class MCPDataToolShim(BaseTool):
             ]
             if file_path.endswith(('.xlsx', '.xls', '.csv')):
                 try:
-                    df = _pd.read_excel(file_path) if file_path.endswith(('.xlsx', '.xls')) else _pd.read_csv(file_path)
+                    try:
+                        profile = _csv_profile(file_path) if file_path.endswith('.csv') else None
+                    except Exception:
+                        profile = None  # the pandas read below reports the same profile
+                    if profile is None:
+                        df = _pd.read_excel(file_path) if file_path.endswith(('.xlsx', '.xls')) else _pd.read_csv(file_path)
+                        profile = (len(df), list(df.columns), df.dtypes.to_dict(), df.isnull().sum().to_dict())
+                    rows, columns, dtypes, nulls = profile
                     info.extend([
-                        f"Rows: {len(df)}",
-                        f"Columns: {list(df.columns)}",
-                        f"Data types: {df.dtypes.to_dict()}",
-                        f"Missing values: {df.isnull().sum().to_dict()}"
+                        f"Rows: {rows}",
+                        f"Columns: {columns}",
+                        f"Data types: {dtypes}",
+                        f"Missing values: {nulls}"
                     ])
                 except Exception:
                     pass
@@ -360,6 +360,9 @@ function App() {
         body: JSON.stringify({
           path: selectedFile,
           content: newContent,
+          // Lets the backend skip sniffing plain text saves for Excel/CSV JSON
+          file_type: fileContent?.path !== selectedFile ? undefined
+            : (fileContent?.file_type === 'excel' || fileContent?.file_type === 'csv') ? fileContent.file_type : 'text',
         }),
       });
 
@@ -375,7 +378,7 @@ function App() {
       console.error('Error saving file:', error);
       alert('Error saving file.');
     }
-  }, [selectedFile, sendMessage, tabId]);
+  }, [selectedFile, fileContent, sendMessage, tabId]);
 
 
 